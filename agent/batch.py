@@ -0,0 +1,73 @@
+import asyncio
+import os
+from typing import AsyncIterator
+from agent.graph import graph
+from models.evaluation import (
+    BatchEvaluationInput,
+    BatchEvaluationItem,
+    EvaluationOutputState,
+)
+
+MAX_BATCH_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+
+
+async def evaluate_batch(batch: BatchEvaluationInput) -> AsyncIterator[dict]:
+    """
+    Evaluate many candidates against one job, yielding results as they finish.
+
+    At most `batch.max_concurrency` candidates (capped by BATCH_MAX_CONCURRENCY)
+    are evaluated at once. Each yielded record carries the item's index in
+    `batch.items`; a failing item yields an error record instead of aborting
+    the batch.
+    """
+    concurrency = min(
+        batch.max_concurrency or MAX_BATCH_CONCURRENCY, MAX_BATCH_CONCURRENCY
+    )
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def evaluate_item(index: int, item: BatchEvaluationItem) -> dict:
+        async with semaphore:
+            try:
+                output = await graph.ainvoke(
+                    {
+                        "source_str": item.source_str,
+                        "profile": item.profile,
+                        "job": batch.job,
+                        "citations": item.citations,
+                        "custom_instructions": batch.custom_instructions,
+                        "evaluate_traits_together": batch.evaluate_traits_together,
+                        "cache_friendly_prompts": batch.cache_friendly_prompts,
+                        "context_token_budget": batch.context_token_budget,
+                        "retrieval_top_k": batch.retrieval_top_k,
+                        "calibrated_profiles_k": batch.calibrated_profiles_k,
+                        "fail_fast": batch.fail_fast,
+                        "required_traits_first": batch.required_traits_first,
+                    }
+                )
+                return {
+                    "index": index,
+                    "public_identifier": item.profile.public_identifier,
+                    "status": "success",
+                    "output": EvaluationOutputState.model_validate(output).model_dump(
+                        mode="json"
+                    ),
+                }
+            except Exception as e:
+                return {
+                    "index": index,
+                    "public_identifier": item.profile.public_identifier,
+                    "status": "error",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+
+    tasks = [
+        asyncio.create_task(evaluate_item(index, item))
+        for index, item in enumerate(batch.items)
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Stop outstanding work if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
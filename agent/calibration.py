@@ -0,0 +1,111 @@
+"""
+Selection of the calibrated profiles most similar to the evaluated candidate.
+"""
+
+import os
+import threading
+from collections import Counter, OrderedDict
+import numpy as np
+from agent.retrieval import tokenize
+from models.jobs import CalibratedProfiles, Job
+from models.linkedin import LinkedInProfile
+
+# 0 disables selection, so every calibrated profile is sent
+DEFAULT_CALIBRATED_PROFILES_K = int(os.getenv("CALIBRATED_PROFILES_K", "0"))
+
+# Indexes of recently seen jobs keyed by the hash of their calibrated profiles,
+# so a batch of candidates for one job builds its index once
+_MAX_INDEXES = 64
+_indexes: OrderedDict[str, "CalibratedProfileIndex"] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _terms(text: str) -> Counter:
+    """Word unigrams and bigrams."""
+    words = tokenize(text)
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def _profile_text(profile: CalibratedProfiles) -> str:
+    if profile.profile:
+        return profile.profile.to_context_string()
+    return profile.reasoning or ""
+
+
+class CalibratedProfileIndex:
+    """TF-IDF vectors of a job's calibrated profiles."""
+
+    def __init__(self, profiles: list[CalibratedProfiles]):
+        self.fits = [profile.fit for profile in profiles]
+        terms = [_terms(_profile_text(profile)) for profile in profiles]
+        self.vocabulary = {
+            term: index
+            for index, term in enumerate(sorted(set().union(*terms)) if terms else [])
+        }
+
+        vectors = np.zeros((len(profiles), len(self.vocabulary)), np.float32)
+        for row, counts in enumerate(terms):
+            columns = [self.vocabulary[term] for term in counts]
+            vectors[row, columns] = list(counts.values())
+
+        document_frequency = (vectors > 0).sum(axis=0)
+        self.idf = np.log((1 + len(profiles)) / (1 + document_frequency)) + 1
+        self.vectors = self._normalize(np.log1p(vectors) * self.idf)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of `text` to every calibrated profile."""
+        vector = np.zeros(len(self.vocabulary), np.float32)
+        for term, count in _terms(text).items():
+            if (column := self.vocabulary.get(term)) is not None:
+                vector[column] = count
+        return self.vectors @ self._normalize(np.log1p(vector) * self.idf)
+
+    def select(self, text: str, k: int) -> list[int]:
+        """
+        Indices of the `k` most similar profiles of each fit, in their original
+        order. Profiles without a fit form their own group.
+        """
+        similarities = self.similarities(text)
+        selected = []
+        for fit in dict.fromkeys(self.fits):
+            group = [index for index, value in enumerate(self.fits) if value == fit]
+            group.sort(key=lambda index: -similarities[index])
+            selected += group[:k]
+        return sorted(selected)
+
+
+def get_calibrated_profile_index(job: Job) -> CalibratedProfileIndex:
+    key = job.calibrated_profiles_hash()
+    with _lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    index = CalibratedProfileIndex(job.calibrated_profiles or [])
+    with _lock:
+        _indexes[key] = index
+        if len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def select_calibrated_profiles(job: Job, profile: LinkedInProfile, k: int) -> Job:
+    """
+    The job with only the `k` good and `k` bad calibrated profiles most
+    similar to the candidate.
+    """
+    profiles = job.calibrated_profiles or []
+    if k <= 0 or len(profiles) <= k:
+        return job
+
+    selected = get_calibrated_profile_index(job).select(profile.to_context_string(), k)
+    if len(selected) == len(profiles):
+        return job
+    return job.model_copy(
+        update={"calibrated_profiles": [profiles[index] for index in selected]}
+    )
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(eq=False)
+class CancelScope:
+    """
+    LLM calls of one evaluation that can be cancelled together.
+
+    Used by fail-fast evaluations: once a required trait is not met, the
+    calls still running in the scope are cancelled and later ones are not
+    started. When `required_first` is set, optional trait calls and the fit
+    call also wait until every required trait has been evaluated.
+
+    Nodes of a synchronous `graph.invoke` use `run_sync` and
+    `wait_for_required_sync`. Their calls cannot be interrupted, so fail-fast
+    only skips the calls not started yet.
+
+    A dataclass like `agent.streaming.EvaluationProgress`, so it serializes
+    in the events of /evaluate/stream_events without its underscored fields.
+    """
+
+    required: int = 0
+    required_first: bool = False
+    # Set once `cancel` interrupted a running call or a later call was skipped,
+    # not merely when `cancel` was called after every call had finished
+    cancelled: bool = False
+    reason: Optional[str] = None
+    _stopped: bool = field(default=False, init=False, repr=False)
+    _required_pending: int = field(init=False, repr=False)
+    _required_done: asyncio.Event = field(
+        default_factory=asyncio.Event, init=False, repr=False
+    )
+    _tasks: set[asyncio.Task] = field(default_factory=set, init=False, repr=False)
+    _required_done_sync: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    # Sync nodes finish required traits from several threads
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self._required_pending = self.required
+        if self.required == 0:
+            self._required_done.set()
+            self._required_done_sync.set()
+
+    async def run(self, awaitable: Awaitable[T]) -> Optional[T]:
+        """Await a call in the scope, or return None if the scope is cancelled."""
+        if self._stopped:
+            awaitable.close()
+            self.cancelled = True
+            return None
+
+        task = asyncio.ensure_future(awaitable)
+        self._tasks.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # Only swallow our own cancellation, not that of the caller
+            if self._stopped and not asyncio.current_task().cancelling():
+                self.cancelled = True
+                return None
+            raise
+        finally:
+            self._tasks.discard(task)
+
+    def run_sync(self, func: Callable[..., T], *args) -> Optional[T]:
+        """Sync version of `run`, for a call that cannot be interrupted."""
+        if self._stopped:
+            self.cancelled = True
+            return None
+        return func(*args)
+
+    async def wait_for_required(self) -> None:
+        """Wait for the required traits when they are evaluated first."""
+        if self.required_first:
+            await self._required_done.wait()
+
+    def wait_for_required_sync(self) -> None:
+        """Sync version of `wait_for_required`."""
+        if self.required_first:
+            self._required_done_sync.wait()
+
+    def required_finished(self, count: int = 1) -> None:
+        with self._lock:
+            self._required_pending -= count
+            done = self._required_pending <= 0
+        if done:
+            self._required_done.set()
+            self._required_done_sync.set()
+
+    def cancel(self, reason: str) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        self.reason = reason
+        self._required_done.set()
+        self._required_done_sync.set()
+        for task in self._tasks:
+            task.cancel()
@@ -0,0 +1,134 @@
+"""
+Career metrics of candidates, computed before prompting so prompts state
+tenure, experience length, funding stages and tech stacks as facts instead of
+leaving the model to infer them from the raw experiences.
+"""
+
+from datetime import date
+from models.career import (
+    CareerMetrics,
+    ExperienceStageMetrics,
+    TechStack,
+    TechStackPatterns,
+)
+from models.linkedin import LinkedInExperience, LinkedInProfile, funding_stages_at
+
+
+def _month(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def merged_months(intervals: list[tuple[int, int]]) -> int:
+    """Months covered by inclusive month intervals, overlaps counted once."""
+    months, reached = 0, None
+    for start, end in sorted(intervals):
+        if reached is None or start > reached:
+            months += end - start + 1
+            reached = end
+        elif end > reached:
+            months += end - reached
+            reached = end
+    return months
+
+
+def _company_key(experience: LinkedInExperience, index: int):
+    """Roles at one company share a key; roles without a company are apart."""
+    company = experience.company_linkedin_profile_url or experience.company
+    return company.strip().lower() if company else index
+
+
+def _experience_text(experience: LinkedInExperience) -> str:
+    parts = [experience.title, experience.description]
+    if experience.summarized_job_description:
+        parts += experience.summarized_job_description.skills
+    return "\n".join(filter(None, parts))
+
+
+def compute_career_metrics(
+    profile: LinkedInProfile, today: date | None = None
+) -> CareerMetrics:
+    """
+    The career metrics of a profile:
+
+    - total experience: the months covered by any role, so overlapping roles,
+      such as a side project during a full-time job, count once
+    - average tenure: the months covered by the roles at each company,
+      promotions included, averaged over companies
+    - current tenure: the longest tenure among the companies of current roles
+
+    Months are counted inclusively, as LinkedIn does, and current roles run to
+    the month of `today`. Roles without a start date are left out of the
+    month counts. Funding stages at join come from the companies' funding
+    timelines and tech stacks from the title, description and skills of
+    every role.
+    """
+    current_month = _month(today or date.today())
+    intervals, companies, current, joined = [], {}, set(), []
+    tags: dict[str, None] = {}
+    for index, experience in enumerate(profile.experiences):
+        tags.update(dict.fromkeys(experience.experience_tags or []))
+        if not experience.starts_at:
+            continue
+        start = _month(experience.starts_at)
+        end = max(
+            _month(experience.ends_at) if experience.ends_at else current_month, start
+        )
+        company = _company_key(experience, index)
+        intervals.append((start, end))
+        companies.setdefault(company, []).append((start, end))
+        if experience.ends_at is None:
+            current.add(company)
+        if experience.company_data:
+            joined.append((experience, end - start + 1))
+
+    stages = [
+        ExperienceStageMetrics(
+            company_name=experience.company or experience.company_data.name,
+            funding_stage=stage,
+            joined_at=experience.starts_at,
+            left_at=experience.ends_at,
+            duration_months=duration,
+        )
+        for (experience, duration), stage in zip(
+            joined,
+            funding_stages_at((e.company_data, e.starts_at) for e, _ in joined),
+        )
+    ]
+
+    stacks: set[TechStack] = set()
+    for match in TechStackPatterns.match_many(
+        _experience_text(experience) for experience in profile.experiences
+    ):
+        stacks |= match.stacks
+
+    tenures = {company: merged_months(roles) for company, roles in companies.items()}
+    return CareerMetrics(
+        total_experience_months=merged_months(intervals) if intervals else None,
+        average_tenure_months=(
+            round(sum(tenures.values()) / len(tenures)) if tenures else None
+        ),
+        current_tenure_months=max((tenures[c] for c in current), default=None),
+        tech_stacks=[stack.value for stack in TechStack if stack in stacks],
+        career_tags=None,
+        experience_tags=list(tags) or None,
+        experience_stages=stages,
+    )
+
+
+def with_career_metrics(
+    profiles: list[LinkedInProfile], today: date | None = None
+) -> list[LinkedInProfile]:
+    """
+    The profiles, with the career metrics of those without any computed.
+    Profiles are copied rather than changed.
+    """
+    return [
+        (
+            profile
+            if profile.career_metrics is not None
+            else profile.model_copy(
+                update={"career_metrics": compute_career_metrics(profile, today)}
+            )
+        )
+        for profile in profiles
+    ]
@@ -0,0 +1,49 @@
+import threading
+from collections import Counter
+from typing import Optional
+from models.base import TraitEvaluationOutput
+from models.jobs import CascadePolicy, KeyTrait
+
+_counts: Counter = Counter()
+_lock = threading.Lock()
+
+
+def escalation_reason(
+    policy: CascadePolicy, trait: KeyTrait, output: TraitEvaluationOutput
+) -> Optional[str]:
+    """Why a fast model answer should be escalated, or None to keep it."""
+    if trait.required and policy.escalate_required_failures and not output.value:
+        return "required_not_met"
+    if output.confidence is None:
+        return "no_confidence"
+    threshold = (
+        policy.required_min_confidence if trait.required else policy.min_confidence
+    )
+    if output.confidence < threshold:
+        return "low_confidence"
+    return None
+
+
+def should_escalate(
+    policy: CascadePolicy, trait: KeyTrait, output: TraitEvaluationOutput
+) -> bool:
+    """Decide whether to escalate a fast model answer and count the decision."""
+    reason = escalation_reason(policy, trait, output)
+    with _lock:
+        _counts["evaluations"] += 1
+        if reason:
+            _counts["escalations"] += 1
+            _counts[f"escalations_{reason}"] += 1
+    return reason is not None
+
+
+def cascade_stats() -> dict:
+    with _lock:
+        counts = dict(_counts)
+    evaluations = counts.get("evaluations", 0)
+    return {
+        **counts,
+        "escalation_rate": (
+            counts.get("escalations", 0) / evaluations if evaluations else None
+        ),
+    }
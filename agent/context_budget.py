@@ -0,0 +1,254 @@
+"""
+Token budgeting for the candidate, source and calibrated profile context that
+is included in every evaluation prompt.
+"""
+
+import os
+from datetime import date
+from itertools import chain, zip_longest
+from agent.sources import join_sources, split_sources
+from models.evaluation import PromptContext
+from models.jobs import CalibratedProfiles, Job
+from models.linkedin import LinkedInExperience, LinkedInProfile
+from services.rate_limiter import estimate_tokens
+
+# 0 disables budgeting
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+
+# How the budget left after the job description and instructions is split
+SECTION_SHARES = {"sources": 0.5, "profile": 0.3, "calibrated_profiles": 0.2}
+
+# Roles whose descriptions are never trimmed, most recent first
+RECENT_EXPERIENCES = 3
+COMPANY_DESCRIPTION_TOKENS = 75
+TRUNCATION_MARKER = "[...]"
+
+
+def allocate(
+    budget: int, sizes: dict[str, int], shares: dict[str, float]
+) -> dict[str, int]:
+    """
+    Split `budget` between sections in proportion to their shares.
+
+    A section that needs less than its share keeps its size and the rest of
+    its share goes to the others.
+    """
+    allocation = {}
+    pending = dict(sizes)
+    remaining = budget
+    while pending:
+        total_share = sum(shares[name] for name in pending)
+        fitting = {
+            name: size
+            for name, size in pending.items()
+            if size <= remaining * shares[name] / total_share
+        }
+        if not fitting:
+            break
+        for name, size in fitting.items():
+            allocation[name] = size
+            remaining -= size
+            del pending[name]
+
+    total_share = sum(shares[name] for name in pending)
+    for name in pending:
+        allocation[name] = int(remaining * shares[name] / total_share)
+    return allocation
+
+
+def truncate(text: str, tokens: int) -> str:
+    """Cut `text` at a word boundary to about `tokens` tokens."""
+    chars = max(tokens, 0) * 4
+    if len(text) <= chars:
+        return text
+    cut = text.rfind(" ", 0, chars)
+    return f"{text[: cut if cut > 0 else chars].rstrip()} {TRUNCATION_MARKER}".lstrip()
+
+
+def _profile_tokens(profile: LinkedInProfile) -> int:
+    return estimate_tokens(profile.to_context_string())
+
+
+def _without_role_details(experience: LinkedInExperience) -> LinkedInExperience:
+    return experience.model_copy(
+        update={"description": None, "summarized_job_description": None}
+    )
+
+
+def _without_company(experience: LinkedInExperience) -> LinkedInExperience:
+    return experience.model_copy(update={"company_data": None})
+
+
+def _with_short_company_description(
+    experience: LinkedInExperience,
+) -> LinkedInExperience:
+    company = experience.company_data
+    if not company or not company.description:
+        return experience
+    description = truncate(company.description, COMPANY_DESCRIPTION_TOKENS)
+    if description == company.description:
+        return experience
+    return experience.model_copy(
+        update={"company_data": company.model_copy(update={"description": description})}
+    )
+
+
+def compact_profile(profile: LinkedInProfile, budget: int) -> LinkedInProfile:
+    """
+    Trim a profile towards `budget` tokens, least valuable content first.
+
+    Company descriptions are shortened, then older roles lose their
+    descriptions and then their company data, oldest role first. Titles, dates,
+    education and the most recent roles are always kept.
+    """
+    if _profile_tokens(profile) <= budget:
+        return profile
+
+    experiences = [
+        _with_short_company_description(experience)
+        for experience in profile.experiences
+    ]
+    profile = profile.model_copy(update={"experiences": experiences})
+
+    by_age = sorted(
+        range(len(experiences)),
+        key=lambda index: experiences[index].starts_at or date.min,
+    )
+    older = by_age[: max(len(experiences) - RECENT_EXPERIENCES, 0)]
+    for trim in (_without_role_details, _without_company):
+        for index in older:
+            if _profile_tokens(profile) <= budget:
+                return profile
+            experiences[index] = trim(experiences[index])
+            profile = profile.model_copy(update={"experiences": list(experiences)})
+
+    return profile
+
+
+def _by_priority(profiles: list[CalibratedProfiles]) -> list[CalibratedProfiles]:
+    """Alternate good and bad fits, ideal profiles first within each."""
+    groups = {}
+    for profile in sorted(profiles, key=lambda profile: profile.type != "ideal"):
+        groups.setdefault(profile.fit, []).append(profile)
+    return [
+        profile
+        for profile in chain.from_iterable(zip_longest(*groups.values()))
+        if profile is not None
+    ]
+
+
+def _compact_calibrated_profile(
+    profile: CalibratedProfiles, budget: int
+) -> CalibratedProfiles:
+    if not profile.profile or estimate_tokens(str(profile)) <= budget:
+        return profile
+    return profile.model_copy(
+        update={"profile": compact_profile(profile.profile, budget)}
+    )
+
+
+def compact_calibrated_profiles(job: Job, budget: int) -> Job:
+    """
+    Fit the calibrated profiles in `budget` tokens.
+
+    The candidate profiles inside them are trimmed like the evaluated
+    candidate's first. Profiles that still do not fit are dropped, keeping good
+    and bad fits in turns so both stay represented, and at least one profile
+    is always kept.
+    """
+    profiles = job.calibrated_profiles or []
+    if estimate_tokens(job.calibrated_profiles_context()) <= budget:
+        return job
+
+    profiles = [
+        _compact_calibrated_profile(profile, budget // len(profiles))
+        for profile in profiles
+    ]
+    kept = set()
+    used = 0
+    for profile in _by_priority(profiles):
+        tokens = estimate_tokens(str(profile))
+        if kept and used + tokens > budget:
+            continue
+        kept.add(id(profile))
+        used += tokens
+
+    return job.model_copy(
+        update={
+            "calibrated_profiles": [
+                profile for profile in profiles if id(profile) in kept
+            ]
+        }
+    )
+
+
+def compact_sources(source_str: str, budget: int) -> str:
+    """
+    Shorten the sources to `budget` tokens, keeping every `[n]` header.
+
+    Every source gets an equal share of the budget; short sources hand what
+    they do not use to the longer ones.
+    """
+    if estimate_tokens(source_str) <= budget:
+        return source_str
+
+    sources = split_sources(source_str)
+    if not sources:
+        return truncate(source_str, budget)
+
+    header_tokens = sum(estimate_tokens(source.header) for source in sources)
+    allocation = allocate(
+        max(budget - header_tokens, 0),
+        {index: estimate_tokens(source.text) for index, source in enumerate(sources)},
+        {index: 1.0 for index in range(len(sources))},
+    )
+    return join_sources(
+        [
+            source._replace(text=truncate(source.text, allocation[index]))
+            for index, source in enumerate(sources)
+        ]
+    )
+
+
+def build_prompt_context(
+    profile: LinkedInProfile,
+    source_str: str,
+    job: Job,
+    custom_instructions: str | None,
+    budget: int | None,
+) -> PromptContext:
+    """
+    Fit the context of an evaluation into `budget` tokens.
+
+    The job description and custom instructions are never trimmed; the rest of
+    the budget is split between the sources, the candidate profile and the
+    calibrated profiles by SECTION_SHARES. Token counts are estimates, and
+    content that is always kept can leave the result above a very small budget.
+    """
+    fixed = estimate_tokens(job.job_description) + estimate_tokens(
+        custom_instructions or ""
+    )
+    sizes = {
+        "sources": estimate_tokens(source_str),
+        "profile": _profile_tokens(profile),
+        "calibrated_profiles": estimate_tokens(job.calibrated_profiles_context()),
+    }
+    tokens_before = fixed + sum(sizes.values())
+
+    if budget and tokens_before > budget:
+        allocation = allocate(max(budget - fixed, 0), sizes, SECTION_SHARES)
+        if source_str != "linkedin_only":
+            source_str = compact_sources(source_str, allocation["sources"])
+        profile = compact_profile(profile, allocation["profile"])
+        job = compact_calibrated_profiles(job, allocation["calibrated_profiles"])
+
+    return PromptContext(
+        profile=profile,
+        source_str=source_str,
+        job=job,
+        tokens_before=tokens_before,
+        tokens_after=fixed
+        + estimate_tokens(source_str)
+        + _profile_tokens(profile)
+        + estimate_tokens(job.calibrated_profiles_context()),
+    )
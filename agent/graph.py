@@ -1,63 +1,319 @@
 from langgraph.constants import Send
 from langgraph.graph import START, END, StateGraph
+from langgraph.utils.runnable import RunnableCallable
+from langchain_core.runnables import RunnableConfig
 from agent.helper_functions import (
-    get_trait_evaluation,
+    aget_fit,
+    aget_trait_evaluation,
+    aget_trait_evaluations,
     get_fit,
+    get_trait_evaluation,
+    get_trait_evaluations,
 )
+from agent.cancellation import CancelScope
+from agent.calibration import DEFAULT_CALIBRATED_PROFILES_K, select_calibrated_profiles
+from agent.career_metrics import with_career_metrics
+from agent.context_budget import DEFAULT_CONTEXT_TOKEN_BUDGET, build_prompt_context
+from agent.retrieval import DEFAULT_RETRIEVAL_TOP_K, retrieve_trait_sources
+from agent.streaming import EvaluationProgress, aemit, emit
+from services.metrics import instrument_node
+from services.usage import TokenUsage, track_usage
+from models.base import FitOutput, TraitEvaluationOutput
+from models.jobs import KeyTrait
 from models.evaluation import (
     EvaluationState,
     EvaluationInputState,
     EvaluationOutputState,
+    TraitEvaluationTask,
 )
 
 
-def dummy_start(state: EvaluationState):
-    return {}
+def prepare_context(state: EvaluationState):
+    (profile,) = with_career_metrics([state.profile])
+
+    k = state.calibrated_profiles_k
+    job = select_calibrated_profiles(
+        state.job, profile, DEFAULT_CALIBRATED_PROFILES_K if k is None else k
+    )
+
+    budget = state.context_token_budget
+    context = build_prompt_context(
+        profile,
+        state.source_str,
+        job,
+        state.custom_instructions,
+        DEFAULT_CONTEXT_TOKEN_BUDGET if budget is None else budget,
+    )
+
+    # Each trait call only gets the passages relevant to its trait. This makes
+    # the sources differ between calls, so it trades away part of the shared
+    # prefix of cache-friendly prompts. Passages come from the budgeted
+    # sources, so no trait prompt exceeds the context token budget.
+    top_k = state.retrieval_top_k
+    top_k = DEFAULT_RETRIEVAL_TOP_K if top_k is None else top_k
+    if top_k and not state.evaluate_traits_together:
+        context.trait_sources = retrieve_trait_sources(
+            context.source_str, state.job.key_traits, top_k
+        )
+
+    return {
+        "context": context,
+        "progress": EvaluationProgress(len(state.job.key_traits)),
+        "cancel_scope": CancelScope(
+            required=sum(trait.required for trait in state.job.key_traits),
+            required_first=state.required_traits_first,
+        ),
+    }
 
 
 def initiate_evaluation(state: EvaluationState):
+    # The fit recommendation does not depend on the trait results, so it runs
+    # alongside the trait fan-out and everything joins at compile_evaluation
+    fit = Send("write_recommendation", state)
+
+    if state.evaluate_traits_together:
+        return [Send("evaluate_sections", state), fit]
+
+    traits = state.job.key_traits
+    if state.required_traits_first:
+        traits = sorted(traits, key=lambda trait: not trait.required)
+
+    # Constructed rather than validated, so the shared context is referenced
+    # as is by every task instead of being checked or copied once per trait
     return [
-        Send("evaluate_section", state.model_copy(update={"section": section}))
-        for section in state.job.key_traits
+        Send(
+            "evaluate_section",
+            TraitEvaluationTask.model_construct(
+                section=section,
+                context=state.context,
+                custom_instructions=state.custom_instructions,
+                cache_friendly_prompts=state.cache_friendly_prompts,
+                fail_fast=state.fail_fast,
+                progress=state.progress,
+                cancel_scope=state.cancel_scope,
+            ),
+        )
+        for section in traits
+    ] + [fit]
+
+
+def completed_section(trait: KeyTrait, content: TraitEvaluationOutput) -> dict:
+    return {
+        "section": trait.trait,
+        "content": content.evaluation,
+        "value": content.value,
+        "required": trait.required,
+    }
+
+
+def section_events(
+    state: EvaluationState | TraitEvaluationTask, sections: list[dict]
+) -> list[dict]:
+    """
+    The events of completed sections, counted in the run's progress.
+
+    In a fail-fast evaluation, a required trait that is not met cancels the
+    rest of the evaluation and adds a `fail_fast` event.
+    """
+    events = [
+        {
+            "type": "trait_evaluation",
+            "section": section,
+            **state.progress.record(section),
+        }
+        for section in sections
     ]
+    if state.fail_fast:
+        for section in sections:
+            if section["required"] and not section["value"]:
+                state.cancel_scope.cancel(section["section"])
+                events.append({"type": "fail_fast", "trait": section["section"]})
+                break
+    return events
 
 
-def evaluate_section(state: EvaluationState):
-    content = get_trait_evaluation(
-        state.section,
-        state.profile,
-        state.source_str,
-        state.custom_instructions,
-        state.job,
+def evaluate_section(state: TraitEvaluationTask, config: RunnableConfig):
+    scope = state.cancel_scope
+    source_str = state.context.trait_sources.get(
+        state.section.trait, state.context.source_str
     )
+    try:
+        if not state.section.required:
+            scope.wait_for_required_sync()
+        with track_usage() as usage:
+            content = scope.run_sync(
+                get_trait_evaluation,
+                state.section,
+                state.context.profile,
+                source_str,
+                state.custom_instructions,
+                state.context.job,
+                state.cache_friendly_prompts,
+            )
+        if content is None:
+            return {"token_usages": [usage.as_dict()]}
+
+        sections = [completed_section(state.section, content)]
+        for event in section_events(state, sections):
+            emit(event, config)
+    finally:
+        if state.section.required:
+            scope.required_finished()
 
     return {
-        "completed_sections": [
-            {
-                "section": state.section.trait,
-                "content": content.evaluation,
-                "value": content.value,
-                "required": state.section.required,
-            }
-        ]
+        "completed_sections": sections,
+        "token_usages": [usage.as_dict()],
     }
 
 
-def write_recommendation(state: EvaluationState):
-    fit = get_fit(
-        state.job,
-        state.profile,
-        state.source_str,
-        state.custom_instructions,
+async def aevaluate_section(state: TraitEvaluationTask, config: RunnableConfig):
+    """Async version of `evaluate_section`."""
+    scope = state.cancel_scope
+    source_str = state.context.trait_sources.get(
+        state.section.trait, state.context.source_str
     )
+    try:
+        if not state.section.required:
+            await scope.wait_for_required()
+        with track_usage() as usage:
+            content = await scope.run(
+                aget_trait_evaluation(
+                    state.section,
+                    state.context.profile,
+                    source_str,
+                    state.custom_instructions,
+                    state.context.job,
+                    state.cache_friendly_prompts,
+                )
+            )
+        if content is None:
+            return {"token_usages": [usage.as_dict()]}
+
+        sections = [completed_section(state.section, content)]
+        for event in section_events(state, sections):
+            await aemit(event, config)
+    finally:
+        if state.section.required:
+            scope.required_finished()
 
+    return {
+        "completed_sections": sections,
+        "token_usages": [usage.as_dict()],
+    }
+
+
+def evaluate_sections(state: EvaluationState, config: RunnableConfig):
+    scope = state.cancel_scope
+    try:
+        with track_usage() as usage:
+            contents = scope.run_sync(
+                get_trait_evaluations,
+                state.job.key_traits,
+                state.context.profile,
+                state.context.source_str,
+                state.custom_instructions,
+                state.context.job,
+                state.cache_friendly_prompts,
+            )
+        if contents is None:
+            return {"token_usages": [usage.as_dict()]}
+
+        sections = [
+            completed_section(trait, contents[trait.trait])
+            for trait in state.job.key_traits
+        ]
+        for event in section_events(state, sections):
+            emit(event, config)
+    finally:
+        scope.required_finished(sum(trait.required for trait in state.job.key_traits))
+
+    return {
+        "completed_sections": sections,
+        "token_usages": [usage.as_dict()],
+    }
+
+
+async def aevaluate_sections(state: EvaluationState, config: RunnableConfig):
+    """Async version of `evaluate_sections`."""
+    scope = state.cancel_scope
+    try:
+        with track_usage() as usage:
+            contents = await scope.run(
+                aget_trait_evaluations(
+                    state.job.key_traits,
+                    state.context.profile,
+                    state.context.source_str,
+                    state.custom_instructions,
+                    state.context.job,
+                    state.cache_friendly_prompts,
+                )
+            )
+        if contents is None:
+            return {"token_usages": [usage.as_dict()]}
+
+        sections = [
+            completed_section(trait, contents[trait.trait])
+            for trait in state.job.key_traits
+        ]
+        for event in section_events(state, sections):
+            await aemit(event, config)
+    finally:
+        scope.required_finished(sum(trait.required for trait in state.job.key_traits))
+
+    return {
+        "completed_sections": sections,
+        "token_usages": [usage.as_dict()],
+    }
+
+
+def recommendation(fit: FitOutput | None, usage: TokenUsage) -> dict:
+    if fit is None:
+        return {"token_usages": [usage.as_dict()]}
     return {
         "summary": fit.reasoning,
         "fit": fit.fit_score,
+        "token_usages": [usage.as_dict()],
     }
 
 
-def compile_evaluation(state: EvaluationState):
+def write_recommendation(state: EvaluationState, config: RunnableConfig):
+    state.cancel_scope.wait_for_required_sync()
+    with track_usage() as usage:
+        fit = state.cancel_scope.run_sync(
+            get_fit,
+            state.context.job,
+            state.context.profile,
+            state.context.source_str,
+            state.custom_instructions,
+            state.cache_friendly_prompts,
+        )
+    if fit is not None:
+        emit({"type": "fit", "fit": fit.fit_score, "summary": fit.reasoning}, config)
+    return recommendation(fit, usage)
+
+
+async def awrite_recommendation(state: EvaluationState, config: RunnableConfig):
+    """Async version of `write_recommendation`."""
+    await state.cancel_scope.wait_for_required()
+    with track_usage() as usage:
+        fit = await state.cancel_scope.run(
+            aget_fit(
+                state.context.job,
+                state.context.profile,
+                state.context.source_str,
+                state.custom_instructions,
+                state.cache_friendly_prompts,
+            )
+        )
+    if fit is not None:
+        await aemit(
+            {"type": "fit", "fit": fit.fit_score, "summary": fit.reasoning}, config
+        )
+    return recommendation(fit, usage)
+
+
+def compiled_evaluation(state: EvaluationState) -> tuple[dict, dict]:
+    """The state update of compile_evaluation and the output it completes."""
     # Create lookup dict for completed traits
     completed_sections_dict = {
         section["section"]: section for section in state.completed_sections
@@ -85,26 +341,84 @@ def compile_evaluation(state: EvaluationState):
                 else:
                     optional_met += 1
 
-    return {
+    # Token usage summed over every LLM call made for this evaluation
+    token_usage = TokenUsage.sum(state.token_usages).as_dict()
+
+    compiled = {
         "sections": ordered_sections,
         "required_met": required_met,
         "optional_met": optional_met,
+        "token_usage": token_usage,
+        # Trait or fit calls were interrupted or skipped by fail-fast
+        "partial": state.cancel_scope.cancelled,
+        "context_tokens": {
+            "before": state.context.tokens_before,
+            "after": state.context.tokens_after,
+        },
+    }
+    output = {
+        field: compiled.get(field, getattr(state, field))
+        for field in EvaluationOutputState.model_fields
     }
+    return compiled, output
+
+
+def compile_evaluation(state: EvaluationState, config: RunnableConfig):
+    compiled, output = compiled_evaluation(state)
+    emit({"type": "evaluation", "output": output}, config)
+    return compiled
+
+
+async def acompile_evaluation(state: EvaluationState, config: RunnableConfig):
+    """Async version of `compile_evaluation`."""
+    compiled, output = compiled_evaluation(state)
+    await aemit({"type": "evaluation", "output": output}, config)
+    return compiled
+
+
+def node(name: str, func, afunc) -> RunnableCallable:
+    """A node with both a sync and an async implementation, both instrumented."""
+    return RunnableCallable(
+        instrument_node(name, func), instrument_node(name, afunc), name=name
+    )
 
 
 builder = StateGraph(
     EvaluationState, input=EvaluationInputState, output=EvaluationOutputState
 )
 
-builder.add_node("dummy_start", dummy_start)
-builder.add_node("evaluate_section", evaluate_section)
-builder.add_node("write_recommendation", write_recommendation)
-builder.add_node("compile_evaluation", compile_evaluation)
+builder.add_node("prepare_context", instrument_node("prepare_context", prepare_context))
+builder.add_node(
+    "evaluate_section",
+    node("evaluate_section", evaluate_section, aevaluate_section),
+    input_schema=TraitEvaluationTask,
+)
+builder.add_node(
+    "evaluate_sections",
+    node("evaluate_sections", evaluate_sections, aevaluate_sections),
+)
+builder.add_node(
+    "write_recommendation",
+    node("write_recommendation", write_recommendation, awrite_recommendation),
+)
+builder.add_node(
+    "compile_evaluation",
+    node("compile_evaluation", compile_evaluation, acompile_evaluation),
+)
 
-builder.add_edge(START, "dummy_start")
-builder.add_conditional_edges("dummy_start", initiate_evaluation, ["evaluate_section"])
-builder.add_edge("evaluate_section", "write_recommendation")
+builder.add_edge(START, "prepare_context")
+# Not traced, so the Send objects the router returns stay out of the event
+# stream, which /evaluate/stream_events serializes to JSON
+builder.add_conditional_edges(
+    "prepare_context",
+    RunnableCallable(initiate_evaluation, trace=False),
+    ["evaluate_section", "evaluate_sections", "write_recommendation"],
+)
+builder.add_edge("evaluate_section", "compile_evaluation")
+builder.add_edge("evaluate_sections", "compile_evaluation")
 builder.add_edge("write_recommendation", "compile_evaluation")
 builder.add_edge("compile_evaluation", END)
 
 graph = builder.compile()
+# Stream the typed progress events of agent.streaming rather than state values
+graph.stream_mode = "custom"
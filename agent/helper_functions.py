@@ -1,18 +1,246 @@
-from langchain_core.messages import HumanMessage, SystemMessage
-from services.llms import llm
+import asyncio
+from collections import Counter
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from services.llms import llm, llm_fast
+from services.cache import cache_key, evaluation_cache
 from langsmith import traceable
 from models.base import (
     TraitEvaluationOutput,
+    MultiTraitEvaluationOutput,
     FitOutput,
 )
 from models.jobs import Job, KeyTrait
 from models.linkedin import LinkedInProfile
+from agent.cascade import should_escalate
 from agent.prompts import (
     trait_evaluation_prompt,
+    multi_trait_evaluation_prompt,
     fit_prompt,
+    evaluation_context_prompt,
+    trait_evaluation_task_prompt,
+    multi_trait_evaluation_task_prompt,
+    fit_task_prompt,
 )
 
 
+def _evaluation_context_message(
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+) -> SystemMessage:
+    """
+    The system message shared by every call of the cache-friendly layout.
+
+    Trait calls bind the same output schema, so they share the whole prefix.
+    The fit call binds a different schema and only shares it with providers
+    that place tool definitions after the messages.
+    """
+    return SystemMessage(
+        content=evaluation_context_prompt.format(
+            job_description=job.job_description,
+            calibrated_profiles=job.calibrated_profiles_context(),
+            custom_instructions=custom_instructions or "",
+            candidate_full_name=profile.full_name,
+            candidate_context=profile.to_context_string(),
+            source_str=source_str if source_str != "linkedin_only" else "",
+        )
+    )
+
+
+def _format_traits(traits: list[KeyTrait]) -> str:
+    return "\n".join(
+        f"- Trait: {trait.trait}\n  Description: {trait.description}"
+        for trait in traits
+    )
+
+
+def _trait_evaluation_messages(
+    trait: KeyTrait,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> list[BaseMessage]:
+    if cache_friendly:
+        return [
+            _evaluation_context_message(profile, source_str, custom_instructions, job),
+            HumanMessage(
+                content=trait_evaluation_task_prompt.format(
+                    trait=trait.trait, trait_description=trait.description
+                )
+            ),
+        ]
+
+    return [
+        SystemMessage(
+            content=trait_evaluation_prompt.format(
+                trait=trait.trait,
+                trait_description=trait.description,
+                candidate_full_name=profile.full_name,
+                candidate_context=profile.to_context_string(),
+                source_str=source_str if source_str != "linkedin_only" else "",
+                custom_instructions=custom_instructions,
+                calibrated_profiles=job.calibrated_profiles_context(),
+            )
+        ),
+        HumanMessage(content=""),
+    ]
+
+
+def _multi_trait_evaluation_messages(
+    traits: list[KeyTrait],
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> list[BaseMessage]:
+    if cache_friendly:
+        return [
+            _evaluation_context_message(profile, source_str, custom_instructions, job),
+            HumanMessage(
+                content=multi_trait_evaluation_task_prompt.format(
+                    traits=_format_traits(traits)
+                )
+            ),
+        ]
+
+    return [
+        SystemMessage(
+            content=multi_trait_evaluation_prompt.format(
+                traits=_format_traits(traits),
+                candidate_full_name=profile.full_name,
+                candidate_context=profile.to_context_string(),
+                source_str=source_str if source_str != "linkedin_only" else "",
+                custom_instructions=custom_instructions,
+                calibrated_profiles=job.calibrated_profiles_context(),
+            )
+        ),
+        HumanMessage(content=""),
+    ]
+
+
+def _fit_messages(
+    job: Job,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    cache_friendly: bool = False,
+) -> list[BaseMessage]:
+    if cache_friendly:
+        return [
+            _evaluation_context_message(profile, source_str, custom_instructions, job),
+            HumanMessage(content=fit_task_prompt),
+        ]
+
+    return [
+        SystemMessage(
+            content=fit_prompt.format(
+                job_description=job.job_description,
+                calibrated_profiles=job.calibrated_profiles_context(),
+                candidate_full_name=profile.full_name,
+                candidate_context=profile.to_context_string(),
+                source_str=source_str,
+                custom_instructions=custom_instructions,
+            )
+        ),
+        HumanMessage(content=""),
+    ]
+
+
+# Hashes of the prompt templates and output schemas a cached answer depends
+# on, so changing either stops serving the entries written before the change.
+# Answers of the multi-trait call are cached per trait, so its prompts count too.
+_TRAIT_EVALUATION_VERSION = cache_key(
+    trait_evaluation_prompt,
+    multi_trait_evaluation_prompt,
+    evaluation_context_prompt,
+    trait_evaluation_task_prompt,
+    multi_trait_evaluation_task_prompt,
+    TraitEvaluationOutput.model_json_schema(),
+    MultiTraitEvaluationOutput.model_json_schema(),
+)
+_FIT_VERSION = cache_key(
+    fit_prompt,
+    evaluation_context_prompt,
+    fit_task_prompt,
+    FitOutput.model_json_schema(),
+)
+
+
+def _trait_evaluation_cache_key(
+    trait: KeyTrait,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> str:
+    return cache_key(
+        "trait_evaluation",
+        _TRAIT_EVALUATION_VERSION,
+        cache_friendly,
+        trait.trait,
+        trait.description,
+        # Whether the cascade escalates an answer depends on it
+        trait.required,
+        profile.full_name,
+        profile.to_context_string(),
+        source_str,
+        custom_instructions,
+        job.calibrated_profiles_context(),
+        llm.model_identity,
+        (job.cascade.model_dump(), llm_fast.model_identity) if job.cascade else None,
+    )
+
+
+def _fit_cache_key(
+    job: Job,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    cache_friendly: bool = False,
+) -> str:
+    return cache_key(
+        "fit",
+        _FIT_VERSION,
+        cache_friendly,
+        job.job_description,
+        profile.full_name,
+        profile.to_context_string(),
+        source_str,
+        custom_instructions,
+        job.calibrated_profiles_context(),
+        llm.model_identity,
+    )
+
+
+def _evaluate_trait(
+    trait: KeyTrait, messages: list[BaseMessage], job: Job
+) -> TraitEvaluationOutput:
+    """Evaluate on `llm`, or on `llm_fast` first when the job has a cascade policy."""
+    if job.cascade:
+        output = llm_fast.with_structured_output(TraitEvaluationOutput).invoke(messages)
+        if not should_escalate(job.cascade, trait, output):
+            return output
+    return llm.with_structured_output(TraitEvaluationOutput).invoke(messages)
+
+
+async def _aevaluate_trait(
+    trait: KeyTrait, messages: list[BaseMessage], job: Job
+) -> TraitEvaluationOutput:
+    """Async version of `_evaluate_trait`."""
+    if job.cascade:
+        output = await llm_fast.with_structured_output(TraitEvaluationOutput).ainvoke(
+            messages
+        )
+        if not should_escalate(job.cascade, trait, output):
+            return output
+    return await llm.with_structured_output(TraitEvaluationOutput).ainvoke(messages)
+
+
 @traceable(name="get_trait_evaluation")
 def get_trait_evaluation(
     trait: KeyTrait,
@@ -20,39 +248,262 @@ def get_trait_evaluation(
     source_str: str,
     custom_instructions: str,
     job: Job,
+    cache_friendly: bool = False,
 ) -> TraitEvaluationOutput:
     """
     Evaluate a candidate on a specific trait.
 
     Args:
-        trait: The name of the trait
-        trait_description: Description of the trait and how to evaluate it
-        candidate_full_name: The candidate's full name
-        candidate_context: Basic context about the candidate
+        trait: The trait to evaluate, with its description
+        profile: The candidate's LinkedIn profile
         source_str: String containing all relevant sources about the candidate
         custom_instructions: Custom instructions for the evaluation
+        job: The job the candidate is evaluated for
+        cache_friendly: Use the prompt layout that shares a prefix across calls
+    """
+    key = _trait_evaluation_cache_key(
+        trait, profile, source_str, custom_instructions, job, cache_friendly
+    )
+    if cached := evaluation_cache.get_model(key, TraitEvaluationOutput):
+        return cached
+
+    output = _evaluate_trait(
+        trait,
+        _trait_evaluation_messages(
+            trait, profile, source_str, custom_instructions, job, cache_friendly
+        ),
+        job,
+    )
+    evaluation_cache.set_model(key, output)
+    return output
+
+
+@traceable(name="aget_trait_evaluation")
+async def aget_trait_evaluation(
+    trait: KeyTrait,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> TraitEvaluationOutput:
+    """Async version of `get_trait_evaluation`."""
+    key = _trait_evaluation_cache_key(
+        trait, profile, source_str, custom_instructions, job, cache_friendly
+    )
+    if cached := await evaluation_cache.aget_model(key, TraitEvaluationOutput):
+        return cached
+
+    output = await _aevaluate_trait(
+        trait,
+        _trait_evaluation_messages(
+            trait, profile, source_str, custom_instructions, job, cache_friendly
+        ),
+        job,
+    )
+    await evaluation_cache.aset_model(key, output)
+    return output
+
+
+def _trait_evaluation_cache_keys(
+    traits: list[KeyTrait],
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> dict[str, str]:
+    return {
+        trait.trait: _trait_evaluation_cache_key(
+            trait, profile, source_str, custom_instructions, job, cache_friendly
+        )
+        for trait in traits
+    }
+
+
+def _collect_trait_evaluations(
+    output: MultiTraitEvaluationOutput,
+    pending: list[KeyTrait],
+    job: Job,
+) -> tuple[dict[str, TraitEvaluationOutput], list[KeyTrait]]:
     """
-    structured_llm = llm.with_structured_output(TraitEvaluationOutput)
-
-    return structured_llm.invoke(
-        [
-            SystemMessage(
-                content=trait_evaluation_prompt.format(
-                    trait=trait.trait,
-                    trait_description=trait.description,
-                    candidate_full_name=profile.full_name,
-                    candidate_context=profile.to_context_string(),
-                    source_str=source_str if source_str != "linkedin_only" else "",
-                    custom_instructions=custom_instructions,
-                    calibrated_profiles=[
-                        str(calibrated_profile)
-                        for calibrated_profile in job.calibrated_profiles
-                    ],
+    The usable answers of a combined call keyed by trait name, and the traits
+    whose answers the job's cascade policy escalates. Traits answered more
+    than once are left out, since the answers may disagree.
+    """
+    results: dict[str, TraitEvaluationOutput] = {}
+    escalated: list[KeyTrait] = []
+    requested = {trait.trait: trait for trait in pending}
+    answers = Counter(evaluation.trait for evaluation in output.evaluations)
+    for evaluation in output.evaluations:
+        trait = requested.get(evaluation.trait)
+        if trait and answers[evaluation.trait] == 1 and evaluation.evaluation.strip():
+            result = TraitEvaluationOutput(
+                value=evaluation.value,
+                evaluation=evaluation.evaluation,
+                confidence=evaluation.confidence,
+            )
+            if job.cascade and should_escalate(job.cascade, trait, result):
+                escalated.append(trait)
+                continue
+            results[evaluation.trait] = result
+    return results, escalated
+
+
+@traceable(name="get_trait_evaluations")
+def get_trait_evaluations(
+    traits: list[KeyTrait],
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> dict[str, TraitEvaluationOutput]:
+    """
+    Evaluate a candidate on several traits with a single structured call.
+
+    Traits with a cached evaluation are not sent again. Traits the model leaves
+    out, duplicates or answers with an empty evaluation are re-evaluated
+    individually with `get_trait_evaluation`, as are all of them if the
+    combined call fails. With a cascade policy the combined call goes to
+    `llm_fast`, and escalated answers are re-evaluated individually on `llm`.
+
+    Returns:
+        The evaluations keyed by trait name, in the order of `traits`
+    """
+    keys = _trait_evaluation_cache_keys(
+        traits, profile, source_str, custom_instructions, job, cache_friendly
+    )
+    evaluations: dict[str, TraitEvaluationOutput] = {}
+    for trait in traits:
+        if cached := evaluation_cache.get_model(
+            keys[trait.trait], TraitEvaluationOutput
+        ):
+            evaluations[trait.trait] = cached
+
+    pending = [trait for trait in traits if trait.trait not in evaluations]
+    escalated: list[KeyTrait] = []
+    if pending:
+        structured_llm = (llm_fast if job.cascade else llm).with_structured_output(
+            MultiTraitEvaluationOutput
+        )
+        try:
+            output = structured_llm.invoke(
+                _multi_trait_evaluation_messages(
+                    pending,
+                    profile,
+                    source_str,
+                    custom_instructions,
+                    job,
+                    cache_friendly,
                 )
-            ),
-            HumanMessage(content=""),
+            )
+            results, escalated = _collect_trait_evaluations(output, pending, job)
+        except Exception:
+            results, escalated = {}, []
+        for name, result in results.items():
+            evaluation_cache.set_model(keys[name], result)
+        evaluations.update(results)
+
+    for trait in traits:
+        if trait.trait in evaluations:
+            continue
+        if trait in escalated:
+            output = llm.with_structured_output(TraitEvaluationOutput).invoke(
+                _trait_evaluation_messages(
+                    trait, profile, source_str, custom_instructions, job, cache_friendly
+                )
+            )
+            evaluation_cache.set_model(keys[trait.trait], output)
+        else:
+            output = get_trait_evaluation(
+                trait, profile, source_str, custom_instructions, job, cache_friendly
+            )
+        evaluations[trait.trait] = output
+
+    return {trait.trait: evaluations[trait.trait] for trait in traits}
+
+
+@traceable(name="aget_trait_evaluations")
+async def aget_trait_evaluations(
+    traits: list[KeyTrait],
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    job: Job,
+    cache_friendly: bool = False,
+) -> dict[str, TraitEvaluationOutput]:
+    """Async version of `get_trait_evaluations`, re-evaluating traits concurrently."""
+    keys = _trait_evaluation_cache_keys(
+        traits, profile, source_str, custom_instructions, job, cache_friendly
+    )
+    cached = await asyncio.gather(
+        *[
+            evaluation_cache.aget_model(keys[trait.trait], TraitEvaluationOutput)
+            for trait in traits
         ]
     )
+    evaluations: dict[str, TraitEvaluationOutput] = {
+        trait.trait: output
+        for trait, output in zip(traits, cached)
+        if output is not None
+    }
+
+    pending = [trait for trait in traits if trait.trait not in evaluations]
+    escalated: list[KeyTrait] = []
+    if pending:
+        structured_llm = (llm_fast if job.cascade else llm).with_structured_output(
+            MultiTraitEvaluationOutput
+        )
+        try:
+            output = await structured_llm.ainvoke(
+                _multi_trait_evaluation_messages(
+                    pending,
+                    profile,
+                    source_str,
+                    custom_instructions,
+                    job,
+                    cache_friendly,
+                )
+            )
+            results, escalated = _collect_trait_evaluations(output, pending, job)
+        except Exception:
+            results, escalated = {}, []
+        await asyncio.gather(
+            *[
+                evaluation_cache.aset_model(keys[name], result)
+                for name, result in results.items()
+            ]
+        )
+        evaluations.update(results)
+
+    async def escalate(trait: KeyTrait) -> TraitEvaluationOutput:
+        output = await llm.with_structured_output(TraitEvaluationOutput).ainvoke(
+            _trait_evaluation_messages(
+                trait, profile, source_str, custom_instructions, job, cache_friendly
+            )
+        )
+        await evaluation_cache.aset_model(keys[trait.trait], output)
+        return output
+
+    missing = [trait for trait in traits if trait.trait not in evaluations]
+    fallback_results = await asyncio.gather(
+        *[
+            (
+                escalate(trait)
+                if trait in escalated
+                else aget_trait_evaluation(
+                    trait, profile, source_str, custom_instructions, job, cache_friendly
+                )
+            )
+            for trait in missing
+        ]
+    )
+    evaluations.update(
+        {trait.trait: result for trait, result in zip(missing, fallback_results)}
+    )
+
+    return {trait.trait: evaluations[trait.trait] for trait in traits}
 
 
 @traceable(name="get_fit")
@@ -61,23 +512,36 @@ def get_fit(
     profile: LinkedInProfile,
     source_str: str,
     custom_instructions: str,
+    cache_friendly: bool = False,
 ) -> FitOutput:
+    key = _fit_cache_key(job, profile, source_str, custom_instructions, cache_friendly)
+    if cached := evaluation_cache.get_model(key, FitOutput):
+        return cached
+
     structured_llm = llm.with_structured_output(FitOutput)
-    return structured_llm.invoke(
-        [
-            SystemMessage(
-                content=fit_prompt.format(
-                    job_description=job.job_description,
-                    calibrated_profiles=[
-                        str(calibrated_profile)
-                        for calibrated_profile in job.calibrated_profiles
-                    ],
-                    candidate_full_name=profile.full_name,
-                    candidate_context=profile.to_context_string(),
-                    source_str=source_str,
-                    custom_instructions=custom_instructions,
-                )
-            ),
-            HumanMessage(content=""),
-        ]
+    output = structured_llm.invoke(
+        _fit_messages(job, profile, source_str, custom_instructions, cache_friendly)
+    )
+    evaluation_cache.set_model(key, output)
+    return output
+
+
+@traceable(name="aget_fit")
+async def aget_fit(
+    job: Job,
+    profile: LinkedInProfile,
+    source_str: str,
+    custom_instructions: str,
+    cache_friendly: bool = False,
+) -> FitOutput:
+    """Async version of `get_fit`."""
+    key = _fit_cache_key(job, profile, source_str, custom_instructions, cache_friendly)
+    if cached := await evaluation_cache.aget_model(key, FitOutput):
+        return cached
+
+    structured_llm = llm.with_structured_output(FitOutput)
+    output = await structured_llm.ainvoke(
+        _fit_messages(job, profile, source_str, custom_instructions, cache_friendly)
     )
+    await evaluation_cache.aset_model(key, output)
+    return output
@@ -4,9 +4,10 @@ trait_evaluation_prompt = """
     You are also given a string of sources that contain information about the candidate.
     Think step by step about the trait and the candidate, like a hiring manager would, and then output your evaluation.
 
-    Output two values:
+    Output three values:
     1. A value representing whether the candidate meets the trait: false for no, true for yes
     2. A string of text supporting your evaluation, citing your list of sources. This should be no more than 100 words.
+    3. Your confidence in the value, from 0 to 1: close to 1 when the sources clearly settle it, lower when the evidence is thin or ambiguous
 
     Guidelines:
     - Let the trait description guide you to determine whether a candidate meets the bar to be considered as possessing the trait
@@ -35,6 +36,44 @@ trait_evaluation_prompt = """
     {calibrated_profiles}
 """
 
+multi_trait_evaluation_prompt = """
+    You are an expert at evaluating candidates for a job.
+    You are given a list of traits that you are evaluating the candidate on, each with a description of the trait.
+    You are also given a string of sources that contain information about the candidate.
+    Think step by step about each trait and the candidate, like a hiring manager would, and then output your evaluations.
+
+    Output one evaluation for every trait in the list, each with four values:
+    1. The name of the trait, exactly as it is written in the list
+    2. A value representing whether the candidate meets the trait: false for no, true for yes
+    3. A string of text supporting your evaluation, citing your list of sources. This should be no more than 100 words.
+    4. Your confidence in the value, from 0 to 1: close to 1 when the sources clearly settle it, lower when the evidence is thin or ambiguous
+
+    Guidelines:
+    - Evaluate each trait independently of the others
+    - Let the trait description guide you to determine whether a candidate meets the bar to be considered as possessing the trait
+    - If there is sufficient evidence, or it can be reasonably inferred that the candidate meets everything described in the trait description, return true
+    - If there is insufficient evidence supporting the candidate possessing the trait, return false
+    - Be thoughtful and meticulous in your evaluation, support your claims and carefully analyze the information provided
+    - In the string of text, when you mention information from a source, include a citation by citing the number of the source that links to the url in clickable markdown format.
+    - For example, if you use information from sources 3 and 7, cite them like this: [3](url), [7](url). 
+    - Don't include a citation if you are not referencing a source.
+    - Cite sources liberally.
+    - Do not assume the candidate's gender, keep your evaluation gender-neutral.
+    - {custom_instructions}
+
+    Here are the traits you are evaluating the candidate on, with their descriptions:
+    {traits}
+    Here is the candidate's name:
+    {candidate_full_name}
+    Here is the candidate's basic profile:
+    {candidate_context}
+    Here are the sources about the candidate.
+    {source_str}
+
+    Here are profiles of candidates that have been deemed good and bad fits for this job. Use this as further context to evaluate the candidate:
+    {calibrated_profiles}
+"""
+
 fit_prompt = """
     You are an expert at evaluating candidates for a job.
     You are given a specific job description and a list of ideal candidates for the job.
@@ -68,3 +107,99 @@ fit_prompt = """
     Here are profiles of candidates that have been deemed good and bad fits for this job. Use this as further context to evaluate the candidate:
     {calibrated_profiles}
 """
+
+# Cache-friendly layout: every call for a candidate starts with the same system
+# message, ordered from job-level to candidate-level content, and only the
+# task-specific instructions that follow it differ between calls. Providers
+# that cache prompt prefixes (Azure OpenAI, Vertex) can then reuse the shared
+# part across all trait calls of a candidate and across candidates of a job.
+
+evaluation_context_prompt = """
+    You are an expert at evaluating candidates for a job.
+    You will be given a task about the candidate below, using the job, the candidate's profile and a string of sources that contain information about the candidate.
+
+    Here is the job description:
+    {job_description}
+
+    Here are profiles of candidates that have been deemed good and bad fits for this job. Use this as further context to evaluate the candidate:
+    {calibrated_profiles}
+
+    Here are additional instructions for the evaluation:
+    {custom_instructions}
+
+    Here is the candidate's name:
+    {candidate_full_name}
+    Here is the candidate's basic profile:
+    {candidate_context}
+    Here are the sources about the candidate:
+    {source_str}
+"""
+
+trait_evaluation_task_prompt = """
+    Your task is to evaluate the candidate on a specific trait, given a description of the trait.
+    Think step by step about the trait and the candidate, like a hiring manager would, and then output your evaluation.
+
+    Output three values:
+    1. A value representing whether the candidate meets the trait: false for no, true for yes
+    2. A string of text supporting your evaluation, citing your list of sources. This should be no more than 100 words.
+    3. Your confidence in the value, from 0 to 1: close to 1 when the sources clearly settle it, lower when the evidence is thin or ambiguous
+
+    Guidelines:
+    - Let the trait description guide you to determine whether a candidate meets the bar to be considered as possessing the trait
+    - If there is sufficient evidence, or it can be reasonably inferred that the candidate meets everything described in the trait description, return true
+    - If there is insufficient evidence supporting the candidate possessing the trait, return false
+    - Be thoughtful and meticulous in your evaluation, support your claims and carefully analyze the information provided
+    - In the string of text, when you mention information from a source, include a citation by citing the number of the source that links to the url in clickable markdown format.
+    - For example, if you use information from sources 3 and 7, cite them like this: [3](url), [7](url). 
+    - Don't include a citation if you are not referencing a source.
+    - Cite sources liberally.
+    - Do not assume the candidate's gender, keep your evaluation gender-neutral.
+
+    Here is the trait you are evaluating the candidate on:
+    {trait}
+    Here is the description of the trait:
+    {trait_description}
+"""
+
+multi_trait_evaluation_task_prompt = """
+    Your task is to evaluate the candidate on a list of traits, each with a description of the trait.
+    Think step by step about each trait and the candidate, like a hiring manager would, and then output your evaluations.
+
+    Output one evaluation for every trait in the list, each with four values:
+    1. The name of the trait, exactly as it is written in the list
+    2. A value representing whether the candidate meets the trait: false for no, true for yes
+    3. A string of text supporting your evaluation, citing your list of sources. This should be no more than 100 words.
+    4. Your confidence in the value, from 0 to 1: close to 1 when the sources clearly settle it, lower when the evidence is thin or ambiguous
+
+    Guidelines:
+    - Evaluate each trait independently of the others
+    - Let the trait description guide you to determine whether a candidate meets the bar to be considered as possessing the trait
+    - If there is sufficient evidence, or it can be reasonably inferred that the candidate meets everything described in the trait description, return true
+    - If there is insufficient evidence supporting the candidate possessing the trait, return false
+    - Be thoughtful and meticulous in your evaluation, support your claims and carefully analyze the information provided
+    - In the string of text, when you mention information from a source, include a citation by citing the number of the source that links to the url in clickable markdown format.
+    - For example, if you use information from sources 3 and 7, cite them like this: [3](url), [7](url). 
+    - Don't include a citation if you are not referencing a source.
+    - Cite sources liberally.
+    - Do not assume the candidate's gender, keep your evaluation gender-neutral.
+
+    Here are the traits you are evaluating the candidate on, with their descriptions:
+    {traits}
+"""
+
+fit_task_prompt = """
+    Your task is to score how well the candidate fits the job, comparing them to the job description and the profiles of good and bad fits.
+
+    Output two values:
+    - A score from 0-4 on how well the candidate fits the job given the information provided
+    - A string of text outlining your reasoning for the score, without directly referencing the score. This should be no more than 100 words.
+
+    Guidelines:
+    - A score of 0 means the candidate is not fit for the job at all - they do not meet any of the requirements
+    - A score of 1 means the candidates is likely not fit for the job - they do not meet most of the requirements
+    - A score of 2 means the candidate is potentially fit for the job - they check some of the boxes, but may be lacking in other areas
+    - A score of 3 means the candidate is a fit for the job - they check most of the boxes and are similar to the ideal profiles
+    - A score of 4 means the candidate is an ideal fit for the job - they match the job description and the ideal profiles perfectly
+    - Be thoughtful and meticulous in your evaluation, support your claims and carefully analyze the information provided
+    - Do not assume the candidate's gender, keep your evaluation gender-neutral.
+"""
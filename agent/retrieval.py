@@ -0,0 +1,124 @@
+"""
+Lexical retrieval of the source passages relevant to each key trait.
+"""
+
+import os
+import re
+from collections import Counter
+from typing import NamedTuple
+import numpy as np
+from agent.sources import Source, join_sources, split_sources
+from models.jobs import KeyTrait
+
+# 0 disables retrieval, so every trait call sees all sources
+DEFAULT_RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "0"))
+
+CHUNK_WORDS = 150
+TOKEN = re.compile(r"\w+")
+
+
+class Chunk(NamedTuple):
+    source: int
+    position: int
+    text: str
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def chunk_sources(sources: list[Source]) -> list[Chunk]:
+    """Split every source into passages of at most CHUNK_WORDS words."""
+    chunks = []
+    for index, source in enumerate(sources):
+        words = source.text.split()
+        for position, start in enumerate(range(0, len(words), CHUNK_WORDS)):
+            chunks.append(
+                Chunk(index, position, " ".join(words[start : start + CHUNK_WORDS]))
+            )
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of passages.
+
+    The per-term weights of every passage are computed once, so scoring a
+    query only sums a few columns of the weight matrix.
+    """
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        tokenized = [Counter(tokenize(document)) for document in documents]
+        self.vocabulary = {
+            term: index
+            for index, term in enumerate(
+                sorted(set().union(*tokenized)) if tokenized else []
+            )
+        }
+
+        frequencies = np.zeros((len(documents), len(self.vocabulary)), np.float32)
+        for row, counts in enumerate(tokenized):
+            columns = [self.vocabulary[term] for term in counts]
+            frequencies[row, columns] = list(counts.values())
+
+        lengths = frequencies.sum(axis=1)
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        document_frequency = (frequencies > 0).sum(axis=0)
+        idf = np.log1p(
+            (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+        self.weights = idf * frequencies * (k1 + 1) / (frequencies + norm[:, None])
+
+    def scores(self, query: str) -> np.ndarray:
+        counts = Counter(
+            self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary
+        )
+        if not counts:
+            return np.zeros(len(self.weights), np.float32)
+        columns = list(counts)
+        return self.weights[:, columns] @ np.array(list(counts.values()), np.float32)
+
+    def top_k(self, query: str, k: int) -> list[int]:
+        """Indices of the `k` best matching passages with a positive score."""
+        scores = self.scores(query)
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [int(index) for index in best if scores[index] > 0]
+
+
+def _render(sources: list[Source], chunks: list[Chunk], selected: list[int]) -> str:
+    """The selected passages under their source's `[n]` header, in source order."""
+    by_source: dict[int, list[Chunk]] = {}
+    for index in sorted(selected, key=lambda index: chunks[index][:2]):
+        by_source.setdefault(chunks[index].source, []).append(chunks[index])
+
+    rendered = []
+    for source_index, source_chunks in by_source.items():
+        text = source_chunks[0].text
+        for previous, chunk in zip(source_chunks, source_chunks[1:]):
+            separator = " " if chunk.position == previous.position + 1 else " [...] "
+            text += separator + chunk.text
+        rendered.append(sources[source_index]._replace(text=text))
+    return join_sources(rendered)
+
+
+def retrieve_trait_sources(
+    source_str: str, traits: list[KeyTrait], top_k: int
+) -> dict[str, str]:
+    """
+    The `top_k` source passages most relevant to each trait, keyed by trait.
+
+    Passages keep the `[n]` header of their source so citations still point to
+    the right url. Traits with no matching passage, and source strings without
+    numbered sources, are left out so their calls use the full sources.
+    """
+    sources = split_sources(source_str)
+    chunks = chunk_sources(sources)
+    if not chunks or top_k <= 0:
+        return {}
+
+    index = BM25Index([chunk.text for chunk in chunks])
+    trait_sources = {}
+    for trait in traits:
+        if selected := index.top_k(f"{trait.trait} {trait.description}", top_k):
+            trait_sources[trait.trait] = _render(sources, chunks, selected)
+    return trait_sources
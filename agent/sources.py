@@ -0,0 +1,44 @@
+import re
+from typing import NamedTuple
+
+# A source block starts with its citation number, e.g. "[3] https://..."
+SOURCE_HEADER = re.compile(r"^\[(\d+)\][^\n]*", re.MULTILINE)
+
+
+class Source(NamedTuple):
+    number: int
+    header: str
+    text: str
+
+    def __str__(self) -> str:
+        return "\n".join(part for part in (self.header, self.text) if part)
+
+
+def split_sources(source_str: str) -> list[Source]:
+    """
+    Split a source string into its numbered sources.
+
+    Text before the first `[n]` header is kept as source 0 so nothing is lost.
+    Returns an empty list when the string has no numbered sources.
+    """
+    headers = list(SOURCE_HEADER.finditer(source_str))
+    if not headers:
+        return []
+
+    sources = []
+    if preamble := source_str[: headers[0].start()].strip():
+        sources.append(Source(0, "", preamble))
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        end = next_header.start() if next_header else len(source_str)
+        sources.append(
+            Source(
+                int(header.group(1)),
+                header.group(0).strip(),
+                source_str[header.end() : end].strip(),
+            )
+        )
+    return sources
+
+
+def join_sources(sources: list[Source]) -> str:
+    return "\n\n".join(str(source) for source in sources)
@@ -0,0 +1,62 @@
+"""
+Typed progress events emitted while an evaluation runs.
+
+`graph.astream` (langserve's /evaluate/stream) yields the events themselves,
+and `astream_events` (/evaluate/stream_events) reports each one as an
+`on_custom_event` named after its type:
+
+- `trait_evaluation`: a completed trait with running `required_met` /
+  `optional_met` counters
+- `fit`: the fit score and summary
+- `evaluation`: the compiled output, the same as returned by /evaluate/invoke
+"""
+
+import threading
+from dataclasses import dataclass, field
+from langchain_core.callbacks import adispatch_custom_event, dispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+
+
+@dataclass(eq=False)
+class EvaluationProgress:
+    """Running counts of the trait results of one evaluation.
+
+    One instance is shared by the parallel trait nodes of a run. A dataclass,
+    so the events of /evaluate/stream_events that include it serialize to JSON
+    with its counters; underscored fields are left out.
+    """
+
+    total: int
+    completed: int = 0
+    required_met: int = 0
+    optional_met: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, section: dict) -> dict:
+        """Count a completed section and return the counters after it."""
+        with self._lock:
+            self.completed += 1
+            if section["value"]:
+                if section["required"]:
+                    self.required_met += 1
+                else:
+                    self.optional_met += 1
+            return {
+                "completed": self.completed,
+                "total": self.total,
+                "required_met": self.required_met,
+                "optional_met": self.optional_met,
+            }
+
+
+def emit(event: dict, config: RunnableConfig) -> None:
+    """Send a typed event to the graph stream and to stream_events."""
+    get_stream_writer()(event)
+    dispatch_custom_event(event["type"], event, config=config)
+
+
+async def aemit(event: dict, config: RunnableConfig) -> None:
+    """Async version of `emit`."""
+    get_stream_writer()(event)
+    await adispatch_custom_event(event["type"], event, config=config)
@@ -0,0 +1,66 @@
+"""
+Cost of computing the career metrics of many profiles.
+
+Times `compute_career_metrics` over profiles with overlapping roles and long
+funding histories, and the tech stack matching of their roles on its own,
+which dominates the cost.
+
+Run from the repository root:
+
+    python -m benchmarks.career_metrics --profiles 2000 --experiences 8
+"""
+
+import argparse
+import random
+import timeit
+from datetime import date
+
+from agent.career_metrics import _experience_text, compute_career_metrics
+from benchmarks.fixtures import make_company, make_profile
+from models.career import TechStackPatterns
+
+TODAY = date(2025, 6, 1)
+
+
+def make_profiles(profiles: int, experiences: int, rounds: int) -> list:
+    rng = random.Random(0)
+    items = []
+    for seed in range(profiles):
+        profile = make_profile(experiences=experiences, seed=seed, with_companies=False)
+        for index, experience in enumerate(profile.experiences):
+            experience.company_data = make_company(rng, index, rounds=rounds)
+            # Some overlapping roles, such as advisory or side projects
+            if index and rng.random() < 0.2:
+                experience.ends_at = None
+        items.append(profile)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--funding-rounds", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    profiles = make_profiles(args.profiles, args.experiences, args.funding_rounds)
+    texts = [
+        _experience_text(experience)
+        for profile in profiles
+        for experience in profile.experiences
+    ]
+
+    def best(operation) -> float:
+        return min(timeit.repeat(operation, number=1, repeat=args.repeat)) * 1000
+
+    metrics = best(lambda: [compute_career_metrics(p, TODAY) for p in profiles])
+    tech_stacks = best(lambda: TechStackPatterns.match_many(texts))
+
+    print(f"{args.profiles} profiles, {args.experiences} experiences each")
+    print(f"career metrics:  {metrics:.1f} ms ({metrics / args.profiles:.2f} ms each)")
+    print(f"tech stacks:     {tech_stacks:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cost of rendering the candidate and calibrated profiles for one request.
+
+A request renders the candidate context once per trait plus once for the fit
+call, and every calibrated profile in each of those calls. The benchmark
+compares doing that from scratch every time with the memoized rendering of
+freshly parsed models, whose time includes the first render of the candidate
+and hashing the calibrated profiles to find their cached rendering.
+
+Run from the repository root:
+
+    python -m benchmarks.context_rendering --traits 10 --calibrated-profiles 10
+"""
+
+import argparse
+import time
+import timeit
+
+from benchmarks.fixtures import make_job, make_profile
+from models.jobs import Job
+from models.linkedin import LinkedInProfile
+from models.serializable import _MEMO
+
+
+def forget(profile: LinkedInProfile) -> None:
+    """Drop memoized renderings so the next render starts from scratch."""
+    profile.__dict__.pop(_MEMO, None)
+    for experience in profile.experiences:
+        if experience.company_data:
+            experience.company_data.__dict__.pop(_MEMO, None)
+
+
+def render_unmemoized(profile: LinkedInProfile, job: Job, calls: int) -> None:
+    for _ in range(calls):
+        forget(profile)
+        profile.to_context_string()
+        rendered = []
+        for calibrated_profile in job.calibrated_profiles:
+            calibrated_profile.__dict__.pop(_MEMO, None)
+            forget(calibrated_profile.profile)
+            rendered.append(str(calibrated_profile))
+        str(rendered)
+
+
+def render_memoized(profile: LinkedInProfile, job: Job, calls: int) -> None:
+    for _ in range(calls):
+        profile.to_context_string()
+        job.calibrated_profiles_context()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--experiences", type=int, default=15)
+    parser.add_argument("--traits", type=int, default=10)
+    parser.add_argument("--calibrated-profiles", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    profile = make_profile(experiences=args.experiences)
+    job = make_job(traits=args.traits, calibrated_profiles=args.calibrated_profiles)
+    profile_json, job_json = profile.model_dump_json(), job.model_dump_json()
+    calls = args.traits + 1
+
+    before = min(
+        timeit.repeat(
+            lambda: render_unmemoized(profile, job, calls), number=1, repeat=args.repeat
+        )
+    )
+    timings = []
+    for _ in range(args.repeat):
+        # Each request renders freshly parsed models, so nothing is memoized yet;
+        # parsing is left out of the timing
+        fresh_profile = LinkedInProfile.model_validate_json(profile_json)
+        fresh_job = Job.model_validate_json(job_json)
+        start = time.perf_counter()
+        render_memoized(fresh_profile, fresh_job, calls)
+        timings.append(time.perf_counter() - start)
+    after = min(timings)
+
+    print(
+        f"{args.experiences} experiences, {args.traits} traits, "
+        f"{args.calibrated_profiles} calibrated profiles: "
+        f"{calls * (1 + args.calibrated_profiles)} renders per request"
+    )
+    print(f"render every call: {before * 1000:.2f} ms/request")
+    print(f"memoized:          {after * 1000:.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
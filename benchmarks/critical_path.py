@@ -0,0 +1,147 @@
+"""
+Critical path of the evaluation graph with and without the concurrent fit call.
+
+The LLM helpers are replaced with sleeps of fixed latency, so the measured
+wall time is the graph's critical path:
+
+    before: max(trait latencies) + fit latency
+    after:  max(max(trait latencies), fit latency)
+
+Run from the repository root:
+
+    python -m benchmarks.critical_path --traits 10 --trait-latency 2.0 --fit-latency 2.5
+"""
+
+import argparse
+import asyncio
+import time
+
+from langgraph.constants import Send
+from langgraph.graph import START, END, StateGraph
+
+import agent.graph as evaluation_graph
+from models.base import FitOutput, TraitEvaluationOutput
+from models.evaluation import (
+    EvaluationInputState,
+    EvaluationOutputState,
+    EvaluationState,
+    TraitEvaluationTask,
+)
+from models.jobs import Job, KeyTrait
+from models.linkedin import LinkedInProfile
+
+
+def build_sequential_graph():
+    """The graph as it was wired before the fit call joined the fan-out."""
+
+    def initiate_evaluation(state: EvaluationState):
+        return [
+            Send(
+                "evaluate_section",
+                TraitEvaluationTask.model_construct(
+                    section=section,
+                    context=state.context,
+                    custom_instructions=state.custom_instructions,
+                    cache_friendly_prompts=state.cache_friendly_prompts,
+                    fail_fast=state.fail_fast,
+                    progress=state.progress,
+                    cancel_scope=state.cancel_scope,
+                ),
+            )
+            for section in state.job.key_traits
+        ]
+
+    builder = StateGraph(
+        EvaluationState, input=EvaluationInputState, output=EvaluationOutputState
+    )
+    builder.add_node("prepare_context", evaluation_graph.prepare_context)
+    builder.add_node(
+        "evaluate_section",
+        evaluation_graph.aevaluate_section,
+        input_schema=TraitEvaluationTask,
+    )
+    builder.add_node("write_recommendation", evaluation_graph.awrite_recommendation)
+    builder.add_node("compile_evaluation", evaluation_graph.acompile_evaluation)
+    builder.add_edge(START, "prepare_context")
+    builder.add_conditional_edges(
+        "prepare_context", initiate_evaluation, ["evaluate_section"]
+    )
+    builder.add_edge("evaluate_section", "write_recommendation")
+    builder.add_edge("write_recommendation", "compile_evaluation")
+    builder.add_edge("compile_evaluation", END)
+    return builder.compile()
+
+
+def patch_helpers(trait_latency: float, fit_latency: float):
+    async def aget_trait_evaluation(*args, **kwargs):
+        await asyncio.sleep(trait_latency)
+        return TraitEvaluationOutput(value=True, evaluation="Meets the trait.")
+
+    async def aget_fit(*args, **kwargs):
+        await asyncio.sleep(fit_latency)
+        return FitOutput(fit_score=3, reasoning="Good fit.")
+
+    evaluation_graph.aget_trait_evaluation = aget_trait_evaluation
+    evaluation_graph.aget_fit = aget_fit
+
+
+def make_input(traits: int) -> dict:
+    return {
+        "source_str": "linkedin_only",
+        "citations": [],
+        "profile": LinkedInProfile(
+            full_name="Jane Doe",
+            occupation="Software Engineer",
+            headline=None,
+            summary=None,
+            city=None,
+            country=None,
+            public_identifier="jane-doe",
+        ),
+        "job": Job(
+            job_description="Backend engineer",
+            key_traits=[
+                KeyTrait(trait=f"Trait {i}", description="Description")
+                for i in range(traits)
+            ],
+            calibrated_profiles=[],
+            job_title="Backend Engineer",
+            company_name="Styx",
+        ),
+    }
+
+
+async def measure(graph, payload: dict, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await graph.ainvoke(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traits", type=int, default=10)
+    parser.add_argument("--trait-latency", type=float, default=0.2)
+    parser.add_argument("--fit-latency", type=float, default=0.25)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    patch_helpers(args.trait_latency, args.fit_latency)
+    payload = make_input(args.traits)
+
+    before = await measure(build_sequential_graph(), payload, args.runs)
+    after = await measure(evaluation_graph.graph, payload, args.runs)
+
+    print(
+        f"traits={args.traits} trait_latency={args.trait_latency}s fit_latency={args.fit_latency}s"
+    )
+    print(f"expected before: {args.trait_latency + args.fit_latency:.3f}s")
+    print(f"expected after:  {max(args.trait_latency, args.fit_latency):.3f}s")
+    print(f"sequential fit:  {before:.3f}s")
+    print(f"concurrent fit:  {after:.3f}s ({before / after:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
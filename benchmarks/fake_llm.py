@@ -0,0 +1,174 @@
+"""
+A deterministic fake chat model for running the service without any provider.
+
+`FakeChatModel` implements tool calling, so the regular `with_structured_output`
+path of LangChain produces valid `TraitEvaluationOutput`, `FitOutput` and
+`MultiTraitEvaluationOutput` objects, after a latency drawn from a
+configurable distribution. `install_fake_models` swaps it in for the models
+behind `llm` and `llm_fast`.
+"""
+
+import asyncio
+import math
+import random
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict, Field
+
+from services.rate_limiter import estimate_input_tokens
+
+TRAIT_LINE = re.compile(r"^\s*- Trait: (.+)$", re.MULTILINE)
+
+
+def fake_arguments(name: str, prompt: str, rng: random.Random) -> dict:
+    """Valid arguments for the structured output tool `name`, given the prompt."""
+
+    def trait_evaluation() -> dict:
+        return {
+            "value": rng.random() < 0.7,
+            "evaluation": "The candidate's experience supports this [1](https://example.com/source/1).",
+            "confidence": round(rng.uniform(0.5, 1.0), 2),
+        }
+
+    if name == "TraitEvaluationOutput":
+        return trait_evaluation()
+    if name == "FitOutput":
+        return {
+            "fit_score": rng.randint(0, 4),
+            "reasoning": "The candidate matches most of the job description.",
+        }
+    if name == "MultiTraitEvaluationOutput":
+        return {
+            "evaluations": [
+                {"trait": trait.strip(), **trait_evaluation()}
+                for trait in TRAIT_LINE.findall(prompt)
+            ]
+        }
+    raise ValueError(f"No fake arguments for the {name} tool")
+
+
+class Latency:
+    """
+    Seconds a fake call takes, drawn from a distribution with the given mean.
+
+    Parsed from strings such as `constant:0`, `exponential:0.8` or
+    `lognormal:1.5:0.6` (mean, then sigma of the underlying normal).
+    """
+
+    KINDS = ("constant", "uniform", "exponential", "lognormal")
+
+    def __init__(self, kind: str = "constant", mean: float = 0.0, sigma: float = 0.5):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r}")
+        self.kind = kind
+        self.mean = mean
+        self.sigma = sigma
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, *values = spec.split(":")
+        return cls(kind, *(float(value) for value in values))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean <= 0 or self.kind == "constant":
+            return max(self.mean, 0.0)
+        if self.kind == "uniform":
+            return rng.uniform(0, 2 * self.mean)
+        if self.kind == "exponential":
+            return rng.expovariate(1 / self.mean)
+        # A lognormal with the requested mean
+        return rng.lognormvariate(math.log(self.mean) - self.sigma**2 / 2, self.sigma)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.mean:g}"
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model answering structured output tool calls with random valid values."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model_name: str = "fake-chat-model"
+    latency: Latency = Field(default_factory=Latency)
+    seed: int = 0
+    rng: Optional[random.Random] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: list, *, tool_choice: Any = None, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools],
+            tool_choice=tool_choice,
+            **kwargs,
+        )
+
+    def _rng(self) -> random.Random:
+        if self.rng is None:
+            self.rng = random.Random(self.seed)
+        return self.rng
+
+    def _generate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        time.sleep(self.latency.sample(self._rng()))
+        return self._answer(messages, kwargs.get("tools") or [])
+
+    async def _agenerate(
+        self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency.sample(self._rng()))
+        return self._answer(messages, kwargs.get("tools") or [])
+
+    def _answer(self, messages: list[BaseMessage], tools: list[dict]) -> ChatResult:
+        rng = self._rng()
+        usage = {
+            "input_tokens": estimate_input_tokens(messages),
+            "output_tokens": rng.randint(60, 160),
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+
+        if not tools:
+            message = AIMessage(content="A fake answer.", usage_metadata=usage)
+        else:
+            name = tools[0]["function"]["name"]
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": name,
+                        "args": fake_arguments(
+                            name,
+                            "\n".join(str(message.content) for message in messages),
+                            rng,
+                        ),
+                        "id": f"call_{rng.getrandbits(32):08x}",
+                    }
+                ],
+                usage_metadata=usage,
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def install_fake_models(latency: Latency, seed: int = 0) -> None:
+    """Route `llm` and `llm_fast`, primaries and fallbacks, to fake models."""
+    import services.llms as llms
+
+    for index, client in enumerate((llms.llm, llms.llm_fast)):
+        client.primary_llm = FakeChatModel(
+            model_name=f"fake-primary-{index}", latency=latency, seed=seed + index
+        )
+        client.fallbacks = [
+            FakeChatModel(
+                model_name=f"fake-fallback-{index}",
+                latency=latency,
+                seed=seed + 100 + index,
+            )
+        ]
@@ -0,0 +1,178 @@
+"""
+Deterministic synthetic profiles, jobs and sources for the benchmarks.
+"""
+
+import random
+from datetime import date
+
+from models.career import FundingType
+from models.jobs import CalibratedProfiles, Job, KeyTrait
+from models.linkedin import (
+    AILinkedinJobDescription,
+    Funding,
+    LinkedInCompany,
+    LinkedInEducation,
+    LinkedInExperience,
+    LinkedInProfile,
+)
+
+TITLES = [
+    "Software Engineer",
+    "Senior Software Engineer",
+    "Staff Engineer",
+    "Backend Engineer",
+    "Machine Learning Engineer",
+    "Data Engineer",
+    "Engineering Manager",
+    "Site Reliability Engineer",
+]
+
+SKILLS = [
+    "Python",
+    "Go",
+    "TypeScript",
+    "React",
+    "Kubernetes",
+    "Terraform",
+    "PostgreSQL",
+    "Kafka",
+    "PyTorch",
+    "Spark",
+    "AWS",
+    "GCP",
+    "distributed systems",
+    "microservices",
+    "data pipelines",
+    "LLM applications",
+]
+
+FUNDING_ROUNDS = [
+    FundingType.PRE_SEED,
+    FundingType.SEED,
+    FundingType.SERIES_A,
+    FundingType.SERIES_B,
+    FundingType.SERIES_C,
+    FundingType.SERIES_D,
+    FundingType.POST_IPO_EQUITY,
+]
+
+SCHOOLS = ["Stanford University", "MIT", "UC Berkeley", "University of Waterloo"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(SKILLS) for _ in range(words // 2)) + "."
+
+
+def make_company(rng: random.Random, index: int, rounds: int = 5) -> LinkedInCompany:
+    year = rng.randint(2000, 2015)
+    funding = []
+    for stage in FUNDING_ROUNDS[: rng.randint(1, rounds)]:
+        year += rng.randint(1, 2)
+        funding.append(
+            Funding(
+                funding_type=stage,
+                money_raised=rng.randint(1, 200) * 1_000_000,
+                announced_date=date(year, rng.randint(1, 12), 1),
+                number_of_investors=rng.randint(1, 8),
+                investor_list=[f"Investor {rng.randint(1, 50)}" for _ in range(3)],
+            )
+        )
+    rng.shuffle(funding)
+
+    return LinkedInCompany(
+        company_id=f"company-{index}",
+        name=f"Company {index}",
+        website=f"https://company{index}.example.com",
+        location={"city": "San Francisco", "state": "CA", "country": "US"},
+        description=" ".join(_sentence(rng, 30) for _ in range(6)),
+        industries=["Software Development", "Artificial Intelligence"],
+        funding_data=funding,
+        founded_on=str(year - 6),
+        operating_status="Active",
+    )
+
+
+def make_profile(
+    experiences: int = 15, seed: int = 0, with_companies: bool = True
+) -> LinkedInProfile:
+    """A profile shaped like a senior engineer's enriched LinkedIn record."""
+    rng = random.Random(seed)
+    year = 2024
+    items = []
+    for index in range(experiences):
+        start = date(year - rng.randint(1, 3), rng.randint(1, 12), 1)
+        items.append(
+            LinkedInExperience(
+                title=rng.choice(TITLES),
+                company=f"Company {index}",
+                description=" ".join(_sentence(rng, 24) for _ in range(5)),
+                starts_at=start,
+                ends_at=None if index == 0 else date(year, rng.randint(1, 12), 1),
+                location="San Francisco, CA",
+                company_linkedin_profile_url=f"https://linkedin.com/company/{index}",
+                company_data=make_company(rng, index) if with_companies else None,
+                summarized_job_description=AILinkedinJobDescription(
+                    role_summary=_sentence(rng, 30),
+                    skills=rng.sample(SKILLS, 5),
+                    requirements=[_sentence(rng, 10) for _ in range(3)],
+                    sources=[f"https://jobs.example.com/{index}"],
+                ),
+            )
+        )
+        year = start.year
+
+    return LinkedInProfile(
+        full_name=f"Candidate {seed}",
+        occupation=f"{rng.choice(TITLES)} at Company 0",
+        headline=_sentence(rng, 16),
+        summary=" ".join(_sentence(rng, 30) for _ in range(4)),
+        city="San Francisco",
+        country="United States",
+        public_identifier=f"candidate-{seed}",
+        experiences=items,
+        education=[
+            LinkedInEducation(
+                school=rng.choice(SCHOOLS),
+                degree_name="BS",
+                field_of_study="Computer Science",
+                starts_at=date(year - 4, 9, 1),
+                ends_at=date(year, 6, 1),
+            )
+        ],
+    )
+
+
+def make_job(traits: int = 10, calibrated_profiles: int = 10, seed: int = 0) -> Job:
+    rng = random.Random(seed)
+    return Job(
+        job_description=" ".join(_sentence(rng, 30) for _ in range(10)),
+        key_traits=[
+            KeyTrait(
+                trait=f"{rng.choice(SKILLS)} experience ({index})",
+                description=_sentence(rng, 30),
+                required=index % 3 == 0,
+            )
+            for index in range(traits)
+        ],
+        calibrated_profiles=[
+            CalibratedProfiles(
+                url=f"https://linkedin.com/in/calibrated-{index}",
+                fit="good" if index % 2 == 0 else "bad",
+                reasoning=_sentence(rng, 20),
+                profile=make_profile(experiences=6, seed=1000 + seed * 100 + index),
+            )
+            for index in range(calibrated_profiles)
+        ],
+        job_title="Senior Backend Engineer",
+        company_name="Styx",
+    )
+
+
+def make_source_str(sources: int = 12, seed: int = 0) -> str:
+    """Numbered sources, one `[n] url` block per citation."""
+    rng = random.Random(seed)
+    return "\n\n".join(
+        f"[{index}] https://example.com/source/{index}\n"
+        + " ".join(_sentence(rng, 40) for _ in range(rng.randint(3, 12)))
+        for index in range(1, sources + 1)
+    )
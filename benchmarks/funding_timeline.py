@@ -0,0 +1,150 @@
+"""
+Cost of funding stage queries over many profiles.
+
+Career analytics asks, for every experience, the company's funding stage when
+the candidate joined and the stages it went through until they left. The
+benchmark compares the previous implementation, which filtered and sorted the
+funding rounds on every call, with the per-company `FundingTimeline`, timelines
+built from scratch included, for rounds listed in random and in chronological
+order.
+
+Run from the repository root:
+
+    python -m benchmarks.funding_timeline --profiles 2000 --experiences 8
+"""
+
+import argparse
+import random
+import timeit
+from datetime import date
+
+from benchmarks.fixtures import make_company, make_profile
+from models.career import FundingType
+from models.linkedin import LinkedInCompany, funding_stages_at
+from models.serializable import _MEMO
+
+
+def legacy_stage_at_date(company: LinkedInCompany, target_date: date) -> FundingType:
+    current_stage = FundingType.UNKNOWN
+    for funding in sorted(
+        [f for f in company.funding_data if f.announced_date],
+        key=lambda x: x.announced_date,
+    ):
+        if funding.announced_date <= target_date:
+            current_stage = funding.funding_type
+        else:
+            break
+    return current_stage
+
+
+def legacy_stages_between_dates(
+    company: LinkedInCompany,
+    start_date: date,
+    end_date: date = None,
+    cutoff_date: date = None,
+) -> list[FundingType]:
+    # With the cutoff filter fixed, as the original raised without a cutoff, and
+    # the stage at start_date kept first rather than replaced by the last stage
+    if not company.funding_data:
+        return []
+    end_date = end_date or date.today()
+    relevant_rounds = []
+    valid_funding = [
+        f
+        for f in company.funding_data
+        if f.announced_date and (not cutoff_date or f.announced_date >= cutoff_date)
+    ]
+    if not valid_funding:
+        return [FundingType.UNKNOWN]
+    current_stage = start_stage = legacy_stage_at_date(company, start_date)
+    for funding in sorted(valid_funding, key=lambda x: x.announced_date):
+        if start_date < funding.announced_date <= end_date:
+            if funding.funding_type != current_stage:
+                relevant_rounds.append(funding.funding_type)
+                current_stage = funding.funding_type
+    return list(dict.fromkeys([start_stage] + relevant_rounds))
+
+
+def make_experiences(profiles: int, experiences: int, rounds: int) -> list:
+    rng = random.Random(0)
+    items = []
+    for seed in range(profiles):
+        profile = make_profile(experiences=experiences, seed=seed, with_companies=False)
+        for index, experience in enumerate(profile.experiences):
+            experience.company_data = make_company(rng, index, rounds=rounds)
+            items.append(experience)
+    return items
+
+
+def query_legacy(experiences: list) -> list:
+    return [
+        (
+            legacy_stage_at_date(e.company_data, e.starts_at),
+            legacy_stages_between_dates(e.company_data, e.starts_at, e.ends_at),
+            legacy_stages_between_dates(
+                e.company_data, e.starts_at, e.ends_at, cutoff_date=date(2015, 1, 1)
+            ),
+        )
+        for e in experiences
+    ]
+
+
+def query_timeline(experiences: list) -> list:
+    at_join = funding_stages_at((e.company_data, e.starts_at) for e in experiences)
+    return [
+        (
+            stage,
+            e.company_data.get_funding_stages_between_dates(e.starts_at, e.ends_at),
+            e.company_data.get_funding_stages_between_dates(
+                e.starts_at, e.ends_at, cutoff_date=date(2015, 1, 1)
+            ),
+        )
+        for stage, e in zip(at_join, experiences)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--funding-rounds", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    experiences = make_experiences(args.profiles, args.experiences, args.funding_rounds)
+
+    def fresh_timelines():
+        for experience in experiences:
+            experience.company_data.__dict__.pop(_MEMO, None)
+        query_timeline(experiences)
+
+    def best(operation) -> float:
+        return min(timeit.repeat(operation, number=1, repeat=args.repeat)) * 1000
+
+    results = {}
+    for order in ("random", "chronological"):
+        if order == "chronological":
+            for experience in experiences:
+                experience.company_data.funding_data.sort(
+                    key=lambda f: f.announced_date
+                )
+        assert query_legacy(experiences) == query_timeline(experiences)
+        results[order] = (
+            best(lambda: query_legacy(experiences)),
+            best(fresh_timelines),
+            best(lambda: query_timeline(experiences)),
+        )
+
+    print(
+        f"{args.profiles} profiles, {len(experiences)} experiences, "
+        f"up to {args.funding_rounds} funding rounds per company"
+    )
+    for order, (legacy, timeline, cached) in results.items():
+        print(f"rounds in {order} order:")
+        print(f"  sort per query:           {legacy:.1f} ms")
+        print(f"  timeline, built:          {timeline:.1f} ms")
+        print(f"  timeline, already built:  {cached:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+End-to-end load generator for a running instance of the service.
+
+It posts synthetic evaluations, built from `benchmarks.fixtures`, to
+`/evaluate/invoke` from a fixed number of concurrent clients, and reports the
+throughput, latency percentiles and error rate per status code. Pair it with
+`benchmarks/mock_llm_server.py` to load test without calling any provider:
+
+    python -m benchmarks.load_generator --url http://127.0.0.1:8080 \\
+        --requests 200 --concurrency 16 --traits 10
+
+Each request evaluates a different candidate, unless `--candidates` is set,
+so the evaluation cache only hits when candidates repeat.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.fixtures import make_job, make_profile, make_source_str
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def make_bodies(args) -> list[bytes]:
+    """Request bodies, serialized up front so the clients only measure the service."""
+    job = make_job(
+        traits=args.traits, calibrated_profiles=args.calibrated_profiles
+    ).model_dump(mode="json")
+    return [
+        json.dumps(
+            {
+                "input": {
+                    "source_str": make_source_str(sources=args.sources, seed=seed),
+                    "profile": make_profile(
+                        experiences=args.experiences, seed=seed
+                    ).model_dump(mode="json"),
+                    "job": job,
+                    "citations": [],
+                    "evaluate_traits_together": args.evaluate_traits_together,
+                }
+            }
+        ).encode()
+        for seed in range(args.candidates or args.requests)
+    ]
+
+
+async def run(args) -> dict:
+    bodies = make_bodies(args)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    next_request = iter(range(args.requests))
+
+    async def client(http: httpx.AsyncClient):
+        for index in next_request:
+            start = time.perf_counter()
+            try:
+                response = await http.post(
+                    "/evaluate/invoke",
+                    content=bodies[index % len(bodies)],
+                    headers={"Content-Type": "application/json"},
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            statuses[status] += 1
+            if status == "200":
+                latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=args.timeout, limits=limits
+    ) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*[client(http) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(latencies) / elapsed,
+        "error_rate": 1 - len(latencies) / args.requests,
+        "statuses": dict(statuses),
+    }
+    if latencies:
+        for q in (0.5, 0.9, 0.99):
+            report[f"p{round(q * 100)}_ms"] = percentile(latencies, q) * 1000
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--traits", type=int, default=10)
+    parser.add_argument("--calibrated-profiles", type=int, default=4)
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--sources", type=int, default=8)
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=0,
+        help="Number of distinct candidates to cycle through; 0 for one per request",
+    )
+    parser.add_argument("--evaluate-traits-together", action="store_true")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    for name, value in report.items():
+        if isinstance(value, float):
+            print(f"{name:<20} {value:>12.3f}")
+        else:
+            print(f"{name:<20} {value!s:>12}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
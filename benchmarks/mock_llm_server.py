@@ -0,0 +1,211 @@
+"""
+Local mock of the Azure OpenAI and Vertex AI endpoints used by the service.
+
+It answers Azure chat completions and Gemini calls to Vertex AI's
+OpenAI-compatible chat completions API, including the tool calls LangChain's `with_structured_output` relies on, with the valid
+random values of `benchmarks.fake_llm`. Latency, 429s and 5xx errors can be
+injected, so the full HTTP path of the service, SDK retries, rate limiters,
+circuit breakers and fallbacks included, can be load tested offline.
+
+Run it, then point the service at it:
+
+    python -m benchmarks.mock_llm_server --port 8765 --latency lognormal:1.5 \\
+        --rate-limit-rate 0.02 --error-rate 0.01
+
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765 AZURE_OPENAI_API_KEY=mock \\
+        VERTEX_API_ENDPOINT=http://127.0.0.1:8765 python main.py
+
+`GET /stats` reports the requests received and the failures injected.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.fake_llm import Latency, fake_arguments
+from services.rate_limiter import estimate_tokens
+
+
+class MockSettings:
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        self.latency = latency or Latency()
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+
+settings = MockSettings()
+stats: Counter = Counter()
+app = FastAPI(title="Mock LLM server")
+
+
+async def _injected_failure(provider: str) -> JSONResponse | None:
+    """Sleep for the configured latency, then maybe fail like the provider would."""
+    await asyncio.sleep(settings.latency.sample(settings.rng))
+
+    draw = settings.rng.random()
+    if draw < settings.rate_limit_rate:
+        stats[f"{provider}_429"] += 1
+        return JSONResponse(
+            {
+                "error": {
+                    "code": 429 if provider == "vertex" else "429",
+                    "message": "Rate limit exceeded (mock).",
+                    "status": "RESOURCE_EXHAUSTED",
+                }
+            },
+            status_code=429,
+            headers={"Retry-After": f"{settings.retry_after:g}"},
+        )
+    if draw < settings.rate_limit_rate + settings.error_rate:
+        status_code = settings.rng.choice((500, 503))
+        stats[f"{provider}_{status_code}"] += 1
+        return JSONResponse(
+            {
+                "error": {
+                    "code": status_code,
+                    "message": "The server had an error (mock).",
+                    "status": "UNAVAILABLE" if status_code == 503 else "INTERNAL",
+                }
+            },
+            status_code=status_code,
+        )
+    stats[f"{provider}_200"] += 1
+    return None
+
+
+def _usage(prompt: str, completion: str) -> tuple[int, int]:
+    return estimate_tokens(prompt), estimate_tokens(completion)
+
+
+def _text(content) -> str:
+    """Text of an OpenAI message content, either a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    return "\n".join(
+        part.get("text", "") for part in content or [] if isinstance(part, dict)
+    )
+
+
+async def _chat_completions(provider: str, request: Request, model: str | None = None):
+    """An OpenAI chat completion, answered as `model` or the requested model."""
+    body = await request.json()
+    if failure := await _injected_failure(provider):
+        return failure
+
+    prompt = "\n".join(_text(message.get("content")) for message in body["messages"])
+    tool_choice = body.get("tool_choice")
+    response_format = body.get("response_format") or {}
+
+    if isinstance(tool_choice, dict):
+        tool_name = tool_choice["function"]["name"]
+    elif body.get("tools"):
+        tool_name = body["tools"][0]["function"]["name"]
+    else:
+        tool_name = None
+
+    if tool_name:
+        arguments = json.dumps(fake_arguments(tool_name, prompt, settings.rng))
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{settings.rng.getrandbits(64):016x}",
+                    "type": "function",
+                    "function": {"name": tool_name, "arguments": arguments},
+                }
+            ],
+        }
+        finish_reason, completion = "tool_calls", arguments
+    elif response_format.get("type") == "json_schema":
+        name = response_format["json_schema"]["name"]
+        completion = json.dumps(fake_arguments(name, prompt, settings.rng))
+        message = {"role": "assistant", "content": completion}
+        finish_reason = "stop"
+    else:
+        completion = "A mock answer."
+        message = {"role": "assistant", "content": completion}
+        finish_reason = "stop"
+
+    prompt_tokens, completion_tokens = _usage(prompt, completion)
+    return {
+        "id": f"chatcmpl-{settings.rng.getrandbits(64):016x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model or body.get("model"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+@app.post("/openai/deployments/{deployment}/chat/completions")
+async def azure_chat_completions(deployment: str, request: Request):
+    return await _chat_completions("azure", request, deployment)
+
+
+# Vertex AI's OpenAI-compatible API, which the service uses for Gemini when
+# VERTEX_API_ENDPOINT is set
+@app.post(
+    "/{version}/projects/{project}/locations/{location}"
+    "/endpoints/openapi/chat/completions"
+)
+async def vertex_chat_completions(
+    version: str, project: str, location: str, request: Request
+):
+    return await _chat_completions("vertex", request)
+
+
+@app.get("/stats")
+def get_stats():
+    return dict(stats)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:1.5")
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0, help="Share of 429 responses"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of 500/503 responses"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    global settings
+    settings = MockSettings(
+        latency=Latency.parse(args.latency),
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
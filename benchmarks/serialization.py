@@ -0,0 +1,141 @@
+"""
+Cost of the Firestore serialization of large profiles with company funding data.
+
+Compares `SerializableModel.dict` / `from_dict`, which use the serializer and
+validator pydantic builds per class, with the previous implementation that
+walked every nested dict and list in Python, tried `date.fromisoformat` on
+every string and serialized the experiences and education of a profile twice.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization --experiences 30 --funding-rounds 12
+"""
+
+import argparse
+import random
+import timeit
+import warnings
+from datetime import date
+
+from benchmarks.fixtures import make_company, make_profile
+from models.linkedin import LinkedInProfile
+from models.serializable import SerializableModel
+
+
+def _legacy_serialize(d: dict) -> dict:
+    for key, value in d.items():
+        if isinstance(value, date):
+            d[key] = value.isoformat()
+        elif isinstance(value, dict):
+            d[key] = _legacy_serialize(value)
+        elif isinstance(value, list):
+            d[key] = [
+                (
+                    legacy_dict(item)
+                    if isinstance(item, SerializableModel)
+                    else (
+                        _legacy_serialize(item)
+                        if isinstance(item, dict)
+                        else item.isoformat() if isinstance(item, date) else item
+                    )
+                )
+                for item in value
+            ]
+    return d
+
+
+def _is_iso_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _legacy_deserialize(d: dict) -> dict:
+    for key, value in d.items():
+        if isinstance(value, str):
+            try:
+                d[key] = date.fromisoformat(value)
+            except ValueError:
+                pass
+        elif isinstance(value, dict):
+            d[key] = _legacy_deserialize(value)
+        elif isinstance(value, list):
+            d[key] = [
+                (
+                    _legacy_deserialize(item)
+                    if isinstance(item, dict)
+                    else (
+                        date.fromisoformat(item)
+                        if isinstance(item, str) and _is_iso_date(item)
+                        else item
+                    )
+                )
+                for item in value
+            ]
+    return d
+
+
+def legacy_dict(model: SerializableModel) -> dict:
+    """The previous `dict`, including `LinkedInProfile`'s second pass."""
+    with warnings.catch_warnings():
+        # BaseModel.dict is deprecated in pydantic v2
+        warnings.simplefilter("ignore")
+        d = _legacy_serialize(super(SerializableModel, model).dict())
+    if isinstance(model, LinkedInProfile):
+        d["experiences"] = [legacy_dict(exp) for exp in model.experiences]
+        d["education"] = [legacy_dict(edu) for edu in model.education]
+    return d
+
+
+def legacy_from_dict(cls: type, data: dict):
+    return cls(**_legacy_deserialize(data))
+
+
+def make_large_profile(experiences: int, funding_rounds: int) -> LinkedInProfile:
+    profile = make_profile(experiences=experiences)
+    rng = random.Random(0)
+    for index, experience in enumerate(profile.experiences):
+        experience.company_data = make_company(rng, index, rounds=funding_rounds)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--experiences", type=int, default=30)
+    parser.add_argument("--funding-rounds", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    profile = make_large_profile(args.experiences, args.funding_rounds)
+    data = profile.dict()
+    assert LinkedInProfile.from_dict(data) == profile
+    assert legacy_dict(profile) == data
+
+    def best(operation) -> float:
+        return min(timeit.repeat(operation, number=1, repeat=args.repeat)) * 1000
+
+    # The legacy deserializer converts the dictionary in place, so each run
+    # gets a fresh copy; copying is timed separately and subtracted.
+    copy = best(lambda: profile.dict())
+    results = {
+        "dict, legacy": best(lambda: legacy_dict(profile)),
+        "dict": best(lambda: profile.dict()),
+        "from_dict, legacy": best(
+            lambda: legacy_from_dict(LinkedInProfile, profile.dict())
+        )
+        - copy,
+        "from_dict": best(lambda: LinkedInProfile.from_dict(data)),
+    }
+
+    print(
+        f"{args.experiences} experiences, {args.funding_rounds} funding rounds "
+        "per company"
+    )
+    for name, value in results.items():
+        print(f"{name:<20} {max(value, 0):>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
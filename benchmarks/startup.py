@@ -0,0 +1,64 @@
+"""
+Cold import time of the service and the clients it builds while importing.
+
+Each run imports `main` in a fresh interpreter, the way Cloud Run starts a new
+instance. Secrets come from placeholder environment variables, so a run fails
+loudly if an import-time code path reaches Secret Manager or the network.
+
+Run from the repository root:
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import main
+import services.llms as llms
+print(json.dumps({
+    "import_seconds": time.perf_counter() - started,
+    "clients_built": sum(
+        factory.cache_info().currsize
+        for factory in (llms._azure_chat_openai, llms.get_gemini_2_flash)
+    ),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "AZURE_OPENAI_ENDPOINT": "https://localhost.invalid/",
+        "AZURE_OPENAI_API_KEY": "placeholder",
+    }
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    timings = [result["import_seconds"] for result in results]
+    print(
+        f"import main: median {statistics.median(timings):.3f}s, min {min(timings):.3f}s"
+    )
+    print(f"clients built at import: {results[-1]['clients_built']}")
+
+
+if __name__ == "__main__":
+    main()
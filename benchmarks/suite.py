@@ -0,0 +1,208 @@
+"""
+Offline benchmark suite of the service's own overhead, using a fake LLM.
+
+Every model behind `llm` and `llm_fast` is replaced by `FakeChatModel`, and the
+evaluation cache is disabled, so runs need no network and only measure:
+
+- graph throughput and p50/p99 latency per number of traits and concurrency
+- prompt rendering per request, from freshly parsed models
+- serialization of the evaluation input
+
+With the default zero latency the graph numbers are pure overhead; pass e.g.
+`--latency lognormal:1.5` to simulate provider latency instead.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --baseline baseline.json --tolerance 0.3
+
+With `--baseline`, the run exits with status 1 when a metric is worse than the
+baseline by more than the tolerance, so it can gate CI.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+
+from benchmarks.fake_llm import Latency, install_fake_models
+from benchmarks.fixtures import make_job, make_profile, make_source_str
+
+TRAITS = (5, 10, 20)
+CONCURRENCY = (1, 8, 32)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+async def bench_graph(
+    traits: int, concurrency: int, evaluations: int, seed: int
+) -> dict:
+    from agent.graph import graph
+
+    job = make_job(traits=traits, calibrated_profiles=4, seed=seed)
+    payloads = [
+        {
+            "source_str": make_source_str(sources=8, seed=seed + index),
+            "profile": make_profile(experiences=8, seed=seed + index),
+            "job": job,
+            "citations": [],
+        }
+        for index in range(evaluations)
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def evaluate(payload: dict):
+        async with semaphore:
+            start = time.perf_counter()
+            await graph.ainvoke(payload)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[evaluate(payload) for payload in payloads])
+    elapsed = time.perf_counter() - start
+
+    name = f"graph/traits={traits}/concurrency={concurrency}"
+    return {
+        f"{name}/throughput_per_s": evaluations / elapsed,
+        f"{name}/p50_ms": percentile(latencies, 0.5) * 1000,
+        f"{name}/p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def bench_rendering(traits: int, repeat: int) -> dict:
+    from agent.helper_functions import _fit_messages, _trait_evaluation_messages
+    from models.jobs import Job
+    from models.linkedin import LinkedInProfile
+
+    profile_json = make_profile(experiences=15).model_dump_json()
+    job_json = make_job(traits=traits, calibrated_profiles=10).model_dump_json()
+    source_str = make_source_str(sources=12)
+
+    timings = []
+    for _ in range(repeat):
+        # Each request renders freshly parsed models, so nothing is memoized yet
+        profile = LinkedInProfile.model_validate_json(profile_json)
+        job = Job.model_validate_json(job_json)
+        start = time.perf_counter()
+        for trait in job.key_traits:
+            _trait_evaluation_messages(trait, profile, source_str, "", job)
+        _fit_messages(job, profile, source_str, "")
+        timings.append(time.perf_counter() - start)
+
+    return {f"rendering/traits={traits}/ms_per_request": min(timings) * 1000}
+
+
+def bench_serialization(repeat: int) -> dict:
+    from models.evaluation import EvaluationInputState
+
+    state = EvaluationInputState(
+        source_str=make_source_str(sources=12),
+        profile=make_profile(experiences=15),
+        job=make_job(traits=10, calibrated_profiles=10),
+        citations=[],
+    )
+    data = state.model_dump(mode="json")
+    payload = json.dumps(data)
+
+    def best(operation) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    return {
+        "serialization/model_dump_json_ms": best(lambda: state.model_dump(mode="json")),
+        "serialization/firestore_dict_ms": best(lambda: state.dict()),
+        "serialization/from_dict_ms": best(
+            lambda: EvaluationInputState.from_dict(data)
+        ),
+        "serialization/model_validate_ms": best(
+            lambda: EvaluationInputState.model_validate(data)
+        ),
+        "serialization/model_validate_json_ms": best(
+            lambda: EvaluationInputState.model_validate_json(payload)
+        ),
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics worse than the baseline by more than `tolerance`."""
+    failures = []
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        higher_is_better = name.endswith("_per_s")
+        if higher_is_better:
+            worse = value < expected / (1 + tolerance)
+        else:
+            worse = value > expected * (1 + tolerance)
+        if worse:
+            failures.append(f"{name}: {value:.3f} (baseline {expected:.3f})")
+    return failures
+
+
+async def run(args) -> dict:
+    from services.cache import evaluation_cache
+
+    install_fake_models(Latency.parse(args.latency), seed=args.seed)
+    evaluation_cache.enabled = False
+
+    results = {}
+    for traits in args.traits:
+        for concurrency in args.concurrency:
+            results.update(
+                await bench_graph(
+                    traits,
+                    concurrency,
+                    max(args.evaluations, concurrency),
+                    args.seed,
+                )
+            )
+        results.update(bench_rendering(traits, args.repeat))
+    results.update(bench_serialization(args.repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", default="constant:0")
+    parser.add_argument("--traits", type=int, nargs="+", default=list(TRAITS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(CONCURRENCY))
+    parser.add_argument("--evaluations", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"latency={args.latency}")
+    for name, value in results.items():
+        print(f"{name:<60} {value:>12.3f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = regressions(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cost of detecting tech stacks in experience descriptions.
+
+Compares the previous `TechStackPatterns.detect_tech_stacks`, which scanned the
+text once per keyword for substrings, with the compiled word-boundary matcher,
+one text at a time and in batch. It also counts the descriptions whose stacks
+differ, i.e. where short keywords such as "ai" or "api" only matched inside
+other words.
+
+Run from the repository root:
+
+    python -m benchmarks.tech_stacks --descriptions 10000 --words 80
+"""
+
+import argparse
+import random
+import timeit
+
+from benchmarks.fixtures import SKILLS
+from models.career import TechStack, TechStackPatterns
+
+WORDS = (
+    "led the team that built and maintained our core product for enterprise "
+    "customers working closely with design and product to ship features owned "
+    "the roadmap for the platform and mentored engineers improved reliability "
+    "and performance across services reducing latency and cost while growing "
+    "usage rapid iteration in a small domain focused group regardless of scope"
+).split()
+
+
+def legacy_detect_tech_stacks(text: str) -> set[TechStack]:
+    cls = TechStackPatterns
+    text = text.lower()
+    stacks = set()
+    if any(keyword in text for keyword in cls.BACKEND):
+        stacks.add(TechStack.BACKEND)
+    if any(keyword in text for keyword in cls.FRONTEND):
+        stacks.add(TechStack.FRONTEND)
+    if any(keyword in text for keyword in cls.ML_AI):
+        stacks.add(TechStack.ML_AI)
+    if any(keyword in text for keyword in cls.INFRASTRUCTURE):
+        stacks.add(TechStack.INFRASTRUCTURE)
+    if any(keyword in text for keyword in cls.DATA):
+        stacks.add(TechStack.DATA)
+    if TechStack.BACKEND in stacks and TechStack.FRONTEND in stacks:
+        stacks.add(TechStack.FULLSTACK)
+    elif "full stack" in text or "fullstack" in text:
+        stacks.add(TechStack.FULLSTACK)
+        stacks.add(TechStack.BACKEND)
+        stacks.add(TechStack.FRONTEND)
+    return stacks
+
+
+def make_descriptions(texts: int, words: int) -> list[str]:
+    """Prose with a few skills in it, like most experience descriptions."""
+    rng = random.Random(0)
+    descriptions = []
+    for _ in range(texts):
+        description = rng.choices(WORDS, k=rng.randint(words // 2, words * 3 // 2))
+        for _ in range(rng.randint(0, 4)):
+            description.insert(
+                rng.randrange(len(description) + 1), rng.choice(SKILLS).lower()
+            )
+        descriptions.append(" ".join(description).capitalize() + ".")
+    return descriptions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--descriptions", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = make_descriptions(args.descriptions, args.words)
+
+    single = [TechStackPatterns.match(text) for text in texts]
+    assert single == TechStackPatterns.match_many(texts)
+    changed = sum(
+        legacy_detect_tech_stacks(text) != match.stacks
+        for text, match in zip(texts, single)
+    )
+
+    def best(operation) -> float:
+        return min(timeit.repeat(operation, number=1, repeat=args.repeat)) * 1000
+
+    legacy = best(lambda: [legacy_detect_tech_stacks(text) for text in texts])
+    compiled = best(lambda: [TechStackPatterns.match(text) for text in texts])
+    batch = best(lambda: TechStackPatterns.match_many(texts))
+
+    print(f"{len(texts)} descriptions, {changed} with different stacks than before")
+    print(f"substring scans:   {legacy:.1f} ms")
+    print(f"compiled matcher:  {compiled:.1f} ms")
+    print(f"batch:             {batch:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,52 @@
+import time
+
+# Measured from before the heavy imports below, reported once the app is up
+startup_started_at = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from langserve import add_routes
 from agent.graph import graph
+from agent.batch import evaluate_batch
+from agent.cascade import cascade_stats
+from models.evaluation import BatchEvaluationInput
+from services.cache import evaluation_cache
+from services.circuit_breaker import circuit_breaker_states
+from services.rate_limiter import rate_limiter_stats
+from services.hedging import latency_percentiles
+from services.llms import prefetch_secrets
+from services.usage import usage_by_model
+from services.metrics import InFlightRequestsMiddleware
 from dotenv import load_dotenv
+import json
+import logging
 import os
+import threading
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.startup_seconds = time.perf_counter() - startup_started_at
+    logger.info("Started in %.2fs", app.state.startup_seconds)
+    # In the background, so startup doesn't wait on Secret Manager and the first
+    # model call on the event loop usually doesn't either
+    threading.Thread(target=prefetch_secrets, daemon=True).start()
+    yield
+
+
 app = FastAPI(
     title="Candidate evaluation",
     version="1.0",
     description="",
+    lifespan=lifespan,
 )
+app.add_middleware(InFlightRequestsMiddleware)
 
 add_routes(
     app,
@@ -18,6 +54,41 @@ add_routes(
     path="/evaluate",
 )
 
+
+@app.post("/evaluate/batch_stream")
+async def evaluate_batch_stream(batch: BatchEvaluationInput):
+    """Evaluate many profiles against one job, streaming NDJSON as each finishes."""
+
+    async def ndjson():
+        async for result in evaluate_batch(batch):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "startup_seconds": app.state.startup_seconds}
+
+
+@app.get("/health/llms")
+async def llm_health():
+    """Circuit breaker, rate limiter, latency, token usage, cascade and cache state."""
+    return {
+        "circuit_breakers": circuit_breaker_states(),
+        "rate_limiters": rate_limiter_stats(),
+        "latencies": latency_percentiles(),
+        "token_usage": usage_by_model(),
+        "cascade": cascade_stats(),
+        "evaluation_cache": evaluation_cache.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,5 +1,5 @@
-from typing import Union
-from pydantic import BaseModel
+from typing import Optional, Union
+from pydantic import BaseModel, Field
 
 
 class RecommendationOutput(BaseModel):
@@ -9,8 +9,19 @@ class RecommendationOutput(BaseModel):
 class TraitEvaluationOutput(BaseModel):
     value: Union[bool]
     evaluation: str
+    confidence: Optional[float] = Field(
+        default=None, description="Confidence in the value, from 0 to 1"
+    )
 
 
 class FitOutput(BaseModel):
     fit_score: int  # score 0-4
     reasoning: str
+
+
+class TraitEvaluation(TraitEvaluationOutput):
+    trait: str
+
+
+class MultiTraitEvaluationOutput(BaseModel):
+    evaluations: list[TraitEvaluation]
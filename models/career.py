@@ -1,5 +1,8 @@
+import re
 from datetime import date
 from enum import Enum
+from functools import cache
+from typing import Iterable, NamedTuple
 from .serializable import SerializableModel
 
 
@@ -64,7 +67,7 @@ class ExperienceStageMetrics(SerializableModel):
     joined_at: date
     left_at: date | None
     duration_months: int
-    company_tier: CompanyTier
+    company_tier: CompanyTier | None = None
 
 
 class TechStack(Enum):
@@ -80,6 +83,12 @@ class TechStack(Enum):
     SECURITY = "Security"
 
 
+class TechStackMatch(NamedTuple):
+    stacks: set[TechStack]
+    # Number of occurrences of each keyword found
+    keywords: dict[str, int]
+
+
 class TechStackPatterns:
     """Patterns for identifying different tech stacks from job descriptions."""
 
@@ -206,37 +215,147 @@ class TechStackPatterns:
         "data architecture",
     }
 
+    # Full stack experience stated outright, rather than inferred
+    FULLSTACK = {
+        "full stack",
+        "full-stack",
+        "fullstack",
+    }
+
     @classmethod
     def detect_tech_stacks(cls, text: str) -> set[TechStack]:
         """Detect tech stacks from text description."""
-        text = text.lower()
-        stacks = set()
-
-        # Check for each tech stack
-        if any(keyword in text for keyword in cls.BACKEND):
-            stacks.add(TechStack.BACKEND)
-
-        if any(keyword in text for keyword in cls.FRONTEND):
-            stacks.add(TechStack.FRONTEND)
+        return cls.match(text).stacks
 
-        if any(keyword in text for keyword in cls.ML_AI):
-            stacks.add(TechStack.ML_AI)
-
-        if any(keyword in text for keyword in cls.INFRASTRUCTURE):
-            stacks.add(TechStack.INFRASTRUCTURE)
-
-        if any(keyword in text for keyword in cls.DATA):
-            stacks.add(TechStack.DATA)
-
-        # Infer Full Stack
-        if TechStack.BACKEND in stacks and TechStack.FRONTEND in stacks:
-            stacks.add(TechStack.FULLSTACK)
-        elif "full stack" in text or "fullstack" in text:
-            stacks.add(TechStack.FULLSTACK)
-            stacks.add(TechStack.BACKEND)
-            stacks.add(TechStack.FRONTEND)
+    @classmethod
+    def match(cls, text: str) -> TechStackMatch:
+        """Tech stacks of a text and the keywords found, with their counts."""
+        text = " " + text.lower()
+        return _stack_match(
+            [form for pattern in _KEYWORD_PATTERNS for form in pattern.findall(text)]
+        )
 
-        return stacks
+    @classmethod
+    def match_many(cls, texts: Iterable[str]) -> list[TechStackMatch]:
+        """`match` for many texts, e.g. every experience description of a profile."""
+        patterns = _KEYWORD_PATTERNS
+        return [
+            _stack_match(
+                [form for pattern in patterns for form in pattern.findall(text)]
+            )
+            for text in (" " + text.lower() for text in texts)
+        ]
+
+
+_STACK_KEYWORDS = {
+    TechStack.BACKEND: TechStackPatterns.BACKEND,
+    TechStack.FRONTEND: TechStackPatterns.FRONTEND,
+    TechStack.ML_AI: TechStackPatterns.ML_AI,
+    TechStack.INFRASTRUCTURE: TechStackPatterns.INFRASTRUCTURE,
+    TechStack.DATA: TechStackPatterns.DATA,
+    TechStack.FULLSTACK: TechStackPatterns.FULLSTACK,
+}
+_KEYWORD_STACKS = {
+    keyword: stack
+    for stack, keywords in _STACK_KEYWORDS.items()
+    for keyword in keywords
+}
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """
+    An alternation of the keywords nested by common prefix, so the regex engine
+    follows one branch per character instead of trying every keyword. Branches
+    are greedy, so the longest keyword wins, e.g. "ml ops" over "ml".
+
+    Keywords ending with a word character must end a word, e.g. "ai" but not
+    "aim", with an optional plural "s" as in "apis" or "llms".
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = r"s?(?!\w)" if re.search(r"\w$", keyword) else ""
+
+    def pattern(node: dict) -> str:
+        branches = [
+            re.escape(char) + pattern(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if "" in node:
+            branches.append(node[""])
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return pattern(trie)
+
+
+def _keyword_patterns(keywords: list[str]) -> list[re.Pattern]:
+    """
+    Patterns that together find every keyword in a text prefixed with a space.
+
+    Keywords starting with a word character must also start a word. Rather
+    than a lookbehind, which the regex engine would try at every position, the
+    scan starts with the non-word character before the keyword, e.g. a space,
+    a newline or "(". A single scan keeps matches from overlapping, so a
+    keyword is found once, within the longest keyword that contains it.
+    Keywords such as ".net" match anywhere, as in "asp.net".
+    """
+    word_start = [keyword for keyword in keywords if re.match(r"\w", keyword)]
+    other = [keyword for keyword in keywords if not re.match(r"\w", keyword)]
+    patterns = []
+    if word_start:
+        patterns.append(re.compile(rf"[^\w]({_trie_regex(word_start)})"))
+    if other:
+        patterns.append(re.compile(f"({_trie_regex(other)})"))
+    return patterns
+
+
+_KEYWORD_PATTERNS = _keyword_patterns(list(_KEYWORD_STACKS))
+# Matches don't overlap, so each keyword also counts the keywords it contains,
+# e.g. "infrastructure" within "data infrastructure". Plural forms map to the
+# keywords of their singular.
+_CONTAINED_KEYWORDS = {
+    form: tuple(
+        contained
+        for contained in _KEYWORD_STACKS
+        if any(
+            pattern.search(" " + keyword) for pattern in _keyword_patterns([contained])
+        )
+    )
+    for keyword in _KEYWORD_STACKS
+    for form in (keyword, keyword + "s")
+}
+
+
+# Stacks as bits, so matches combine them without hashing enum members, which
+# is slow
+_STACK_BITS = {stack: 1 << index for index, stack in enumerate(TechStack)}
+_KEYWORD_BITS = {
+    form: sum({_STACK_BITS[_KEYWORD_STACKS[keyword]] for keyword in keywords})
+    for form, keywords in _CONTAINED_KEYWORDS.items()
+}
+
+
+@cache
+def _stacks(bits: int) -> frozenset[TechStack]:
+    stacks = {stack for stack, bit in _STACK_BITS.items() if bits & bit}
+    if TechStack.FULLSTACK in stacks:
+        stacks |= {TechStack.BACKEND, TechStack.FRONTEND}
+    elif TechStack.BACKEND in stacks and TechStack.FRONTEND in stacks:
+        stacks.add(TechStack.FULLSTACK)
+    return frozenset(stacks)
+
+
+def _stack_match(found: list[str]) -> TechStackMatch:
+    bits = 0
+    keywords: dict[str, int] = {}
+    for form in found:
+        bits |= _KEYWORD_BITS[form]
+        for keyword in _CONTAINED_KEYWORDS[form]:
+            keywords[keyword] = keywords.get(keyword, 0) + 1
+    return TechStackMatch(set(_stacks(bits)), keywords)
 
 
 class CareerMetrics(SerializableModel):
@@ -249,3 +368,31 @@ class CareerMetrics(SerializableModel):
     career_tags: list[str] | None
     experience_tags: list[str] | None
     latest_experience_level: str | None = None
+    # Funding stage of the company when the candidate joined, per role
+    experience_stages: list[ExperienceStageMetrics] = []
+
+    def to_context_string(self) -> str:
+        """Convert the metrics to a compact string context."""
+        context = ""
+        if self.total_experience_months is not None:
+            context += f"Total Experience: {self.total_experience_months} months\n"
+        if self.average_tenure_months is not None:
+            context += (
+                f"Average Tenure per Company: {self.average_tenure_months} months\n"
+            )
+        if self.current_tenure_months is not None:
+            context += f"Current Tenure: {self.current_tenure_months} months\n"
+        if self.tech_stacks:
+            context += f"Tech Stacks: {', '.join(self.tech_stacks)}\n"
+        if self.career_tags:
+            context += f"Career Tags: {', '.join(self.career_tags)}\n"
+        if self.experience_tags:
+            context += f"Experience Tags: {', '.join(self.experience_tags)}\n"
+        if self.latest_experience_level:
+            context += f"Latest Experience Level: {self.latest_experience_level}\n"
+        for stage in self.experience_stages:
+            context += f"Joined {stage.company_name} in {stage.joined_at:%Y-%m}"
+            if stage.funding_stage != FundingType.UNKNOWN:
+                context += f" at {stage.funding_stage.value} stage"
+            context += f", for {stage.duration_months} months\n"
+        return context.strip()
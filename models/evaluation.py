@@ -1,10 +1,23 @@
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 import operator
+from pydantic import Field
 from .linkedin import LinkedInProfile
 from .jobs import Job, KeyTrait
 from .serializable import SerializableModel
 
 
+class PromptContext(SerializableModel):
+    """The candidate, sources and job as they are included in prompts."""
+
+    profile: LinkedInProfile
+    source_str: str
+    job: Job
+    tokens_before: int
+    tokens_after: int
+    # Sources retrieved for each trait, keyed by trait name
+    trait_sources: dict[str, str] = {}
+
+
 class EvaluationState(SerializableModel):
     # Input
     source_str: str
@@ -12,10 +25,22 @@ class EvaluationState(SerializableModel):
     job: Job
     citations: list[dict]
     custom_instructions: Optional[str] = None
+    evaluate_traits_together: bool = False
+    cache_friendly_prompts: bool = False
+    context_token_budget: Optional[int] = None
+    retrieval_top_k: Optional[int] = None
+    calibrated_profiles_k: Optional[int] = None
+    fail_fast: bool = False
+    required_traits_first: bool = False
 
     # Intermediate
+    context: Optional[PromptContext] = None
     completed_sections: Annotated[list[dict], operator.add] = []
-    section: Optional[KeyTrait] = None
+    token_usages: Annotated[list[dict], operator.add] = []
+    # agent.streaming.EvaluationProgress shared by the nodes of a run
+    progress: Optional[Any] = Field(default=None, exclude=True)
+    # agent.cancellation.CancelScope of the run's LLM calls
+    cancel_scope: Optional[Any] = Field(default=None, exclude=True)
 
     # Output
     citations: Optional[list[dict]] = None
@@ -24,6 +49,28 @@ class EvaluationState(SerializableModel):
     required_met: Optional[int] = None
     optional_met: Optional[int] = None
     fit: Optional[int] = None
+    token_usage: Optional[dict] = None
+    context_tokens: Optional[dict] = None
+    partial: bool = False
+
+
+class TraitEvaluationTask(SerializableModel):
+    """
+    Input of one per-trait task of the evaluation fan-out.
+
+    Tasks only carry their trait and the options they use. The prompt context
+    is shared by reference between the tasks of a request and never copied,
+    and it is excluded from dumps so that tracing a task does not serialize
+    the candidate, the job and the sources again for every trait.
+    """
+
+    section: KeyTrait
+    context: PromptContext = Field(exclude=True)
+    custom_instructions: Optional[str] = None
+    cache_friendly_prompts: bool = False
+    fail_fast: bool = False
+    progress: Optional[Any] = Field(default=None, exclude=True)
+    cancel_scope: Optional[Any] = Field(default=None, exclude=True)
 
 
 class EvaluationInputState(SerializableModel):
@@ -32,13 +79,45 @@ class EvaluationInputState(SerializableModel):
     job: Job
     citations: list[dict]
     custom_instructions: Optional[str] = None
+    evaluate_traits_together: bool = False
+    cache_friendly_prompts: bool = False
+    context_token_budget: Optional[int] = None
+    retrieval_top_k: Optional[int] = None
+    calibrated_profiles_k: Optional[int] = None
+    fail_fast: bool = False
+    required_traits_first: bool = False
 
 
 class EvaluationOutputState(SerializableModel):
     citations: list[dict]
     sections: list[dict]
-    summary: str
+    # Missing when a fail-fast evaluation cancelled the fit call
+    summary: Optional[str] = None
     required_met: int
     optional_met: int
     source_str: str
-    fit: int
+    fit: Optional[int] = None
+    token_usage: Optional[dict] = None
+    context_tokens: Optional[dict] = None
+    # Whether fail-fast cancelled part of the evaluation
+    partial: bool = False
+
+
+class BatchEvaluationItem(SerializableModel):
+    source_str: str
+    profile: LinkedInProfile
+    citations: list[dict]
+
+
+class BatchEvaluationInput(SerializableModel):
+    job: Job
+    items: list[BatchEvaluationItem]
+    custom_instructions: Optional[str] = None
+    evaluate_traits_together: bool = False
+    cache_friendly_prompts: bool = False
+    context_token_budget: Optional[int] = None
+    retrieval_top_k: Optional[int] = None
+    calibrated_profiles_k: Optional[int] = None
+    fail_fast: bool = False
+    required_traits_first: bool = False
+    max_concurrency: Optional[int] = None
@@ -1,8 +1,17 @@
+from collections import OrderedDict
 from datetime import datetime
 from typing import Literal, Optional
+import hashlib
+import threading
 from models.linkedin import LinkedInProfile
 from pydantic import BaseModel, Field
-from .serializable import SerializableModel
+from .serializable import SerializableModel, memoized
+
+# Rendered calibrated profile blocks keyed by a hash of the profiles, so jobs
+# sent again with every request share one rendering
+_calibrated_profiles_contexts: OrderedDict[str, str] = OrderedDict()
+_MAX_CALIBRATED_PROFILES_CONTEXTS = 256
+_calibrated_profiles_contexts_lock = threading.Lock()
 
 
 class KeyTrait(BaseModel):
@@ -11,6 +20,21 @@ class KeyTrait(BaseModel):
     required: bool = True
 
 
+class CascadePolicy(BaseModel):
+    """
+    Evaluate traits on the fast model first and escalate uncertain answers.
+
+    An answer is escalated to the main model when its confidence is below
+    `min_confidence`, or `required_min_confidence` for required traits, when
+    the fast model reports no confidence, or when it rejects a required trait
+    and `escalate_required_failures` is set.
+    """
+
+    min_confidence: float = 0.7
+    required_min_confidence: float = 0.85
+    escalate_required_failures: bool = True
+
+
 class CalibratedProfiles(SerializableModel):
     """Represents a candidate to be calibrated"""
 
@@ -20,6 +44,7 @@ class CalibratedProfiles(SerializableModel):
     profile: Optional[LinkedInProfile] = None
     type: Literal["ideal", "pipeline"] = "pipeline"
 
+    @memoized
     def __str__(self):
         output = ""
         if self.fit:
@@ -39,4 +64,32 @@ class Job(SerializableModel):
     calibrated_profiles: list[CalibratedProfiles] = None
     job_title: str
     company_name: str
+    cascade: Optional[CascadePolicy] = None
     created_at: datetime = Field(default_factory=datetime.now)
+
+    @memoized
+    def calibrated_profiles_hash(self) -> str:
+        """A hash of the calibrated profiles' content, stable across requests."""
+        return hashlib.sha256(
+            "\n".join(
+                profile.model_dump_json() for profile in self.calibrated_profiles or []
+            ).encode()
+        ).hexdigest()
+
+    @memoized
+    def calibrated_profiles_context(self) -> str:
+        """Render the calibrated profiles the way they are included in prompts."""
+        profiles = self.calibrated_profiles or []
+        key = self.calibrated_profiles_hash()
+
+        with _calibrated_profiles_contexts_lock:
+            if key in _calibrated_profiles_contexts:
+                _calibrated_profiles_contexts.move_to_end(key)
+                return _calibrated_profiles_contexts[key]
+
+        context = str([str(profile) for profile in profiles])
+        with _calibrated_profiles_contexts_lock:
+            _calibrated_profiles_contexts[key] = context
+            if len(_calibrated_profiles_contexts) > _MAX_CALIBRATED_PROFILES_CONTEXTS:
+                _calibrated_profiles_contexts.popitem(last=False)
+        return context
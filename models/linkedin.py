@@ -2,8 +2,11 @@
 LinkedIn data models with standardized serialization.
 """
 
+from bisect import bisect_left, bisect_right
 from datetime import date
-from .serializable import SerializableModel
+from functools import cached_property
+from typing import Iterable
+from .serializable import SerializableModel, memoized
 from .career import CareerMetrics, FundingType
 
 
@@ -17,6 +20,103 @@ class Funding(SerializableModel):
     investor_list: list[str] = []
 
 
+class FundingTimeline:
+    """
+    The dated funding rounds of a company in chronological order.
+
+    Built once per company, it answers stage queries with a binary search over
+    the round dates instead of filtering and sorting the rounds every time.
+    Rounds announced on the same day keep their order in `funding_data`.
+    """
+
+    def __init__(self, funding_data: list[Funding]):
+        self.funding_data = funding_data
+        rounds = [f for f in funding_data if f.announced_date]
+        dates = [f.announced_date for f in rounds]
+        # Rounds usually come in order already, which a scan is cheaper to
+        # confirm than a sort; a stable sort keeps same-day rounds in order
+        if any(later < earlier for earlier, later in zip(dates, dates[1:])):
+            order = sorted(range(len(dates)), key=dates.__getitem__)
+            rounds = [rounds[index] for index in order]
+            dates = [dates[index] for index in order]
+        self.rounds = rounds
+        self.dates = dates
+        self.stages = [f.funding_type for f in rounds]
+
+    @cached_property
+    def total_funding(self) -> int:
+        return sum(
+            f.money_raised for f in self.funding_data if f.money_raised is not None
+        )
+
+    @cached_property
+    def latest_round(self) -> Funding | None:
+        """The first of the rounds announced on the latest date."""
+        if not self.rounds:
+            return None
+        return self.rounds[bisect_left(self.dates, self.dates[-1])]
+
+    def stage_at(self, target_date: date) -> FundingType:
+        """The stage of the last round announced on or before `target_date`."""
+        index = bisect_right(self.dates, target_date)
+        return self.stages[index - 1] if index else FundingType.UNKNOWN
+
+    def stages_at(self, target_dates: Iterable[date | None]) -> list[FundingType]:
+        """`stage_at` for each date, with UNKNOWN for missing dates."""
+        return [
+            self.stage_at(target_date) if target_date else FundingType.UNKNOWN
+            for target_date in target_dates
+        ]
+
+    def stages_between(
+        self, start_date: date, end_date: date = None, cutoff_date: date = None
+    ) -> list[FundingType]:
+        """
+        The stage at `start_date`, then each new stage reached by rounds
+        announced after it and up to `end_date`, ignoring rounds announced
+        before `cutoff_date`. See `LinkedInCompany.get_funding_stages_between_dates`.
+        """
+        first = bisect_left(self.dates, cutoff_date) if cutoff_date else 0
+        if first == len(self.dates):
+            return [FundingType.UNKNOWN]
+
+        end_date = end_date or date.today()
+        current_stage = self.stage_at(start_date)
+        stages = [current_stage]
+        for index in range(
+            max(first, bisect_right(self.dates, start_date)),
+            bisect_right(self.dates, end_date),
+        ):
+            stage = self.stages[index]
+            if stage != current_stage:
+                current_stage = stage
+                # A list rather than a set: stages are few, and hashing enum
+                # members is slow
+                if stage not in stages:
+                    stages.append(stage)
+
+        return stages
+
+
+def funding_stages_at(
+    queries: Iterable[tuple["LinkedInCompany | None", date | None]],
+) -> list[FundingType]:
+    """
+    The funding stage of each company at the paired date, e.g. the stage of
+    every experience's company when the candidate joined, across profiles.
+
+    Each company's timeline is built on its first query and reused after.
+    """
+    return [
+        (
+            company.funding_timeline().stage_at(target_date)
+            if company is not None and target_date
+            else FundingType.UNKNOWN
+        )
+        for company, target_date in queries
+    ]
+
+
 class LinkedInCompany(SerializableModel):
     """Model for LinkedIn company profile data."""
 
@@ -40,26 +140,14 @@ class LinkedInCompany(SerializableModel):
             return FundingType.UNKNOWN
         return self.funding_data[-1].funding_type
 
+    @memoized
+    def funding_timeline(self) -> FundingTimeline:
+        """The dated funding rounds, sorted once and reused by every query."""
+        return FundingTimeline(self.funding_data)
+
     def get_funding_stage_at_date(self, target_date: date) -> FundingType:
         """Get the company's funding stage at a specific date."""
-        if not self.funding_data:
-            return FundingType.UNKNOWN
-
-        current_stage = FundingType.UNKNOWN
-
-        for funding in sorted(
-            [f for f in self.funding_data if f.announced_date],
-            key=lambda x: x.announced_date,
-        ):
-            try:
-                if funding.announced_date <= target_date:
-                    current_stage = funding.funding_type
-                else:
-                    break
-            except (ValueError, TypeError):
-                continue
-
-        return current_stage
+        return self.funding_timeline().stage_at(target_date)
 
     def get_funding_stages_between_dates(
         self, start_date: date, end_date: date = None, cutoff_date: date = None
@@ -73,36 +161,9 @@ class LinkedInCompany(SerializableModel):
         """
         if not self.funding_data:
             return []
+        return self.funding_timeline().stages_between(start_date, end_date, cutoff_date)
 
-        end_date = end_date or date.today()
-        relevant_rounds = []
-
-        # Filter funding data by cutoff date if provided
-        valid_funding = [
-            f
-            for f in self.funding_data
-            if f.announced_date and (not cutoff_date or f.announced_date) >= cutoff_date
-        ]
-
-        if not valid_funding:
-            return [FundingType.UNKNOWN]
-
-        # Get initial stage from valid funding rounds
-        current_stage = self.get_funding_stage_at_date(start_date)
-
-        for funding in sorted(valid_funding, key=lambda x: x.announced_date):
-            try:
-                funding_date = funding.announced_date
-                if start_date < funding_date <= end_date:
-                    stage = funding.funding_type
-                    if stage != current_stage:
-                        relevant_rounds.append(stage)
-                        current_stage = stage
-            except (ValueError, TypeError):
-                continue
-
-        return list(dict.fromkeys([current_stage] + relevant_rounds))
-
+    @memoized
     def to_context_string(self) -> str:
         """Convert the company profile to a formatted string context."""
         context = f"Company: {self.name}\n\n"
@@ -131,30 +192,11 @@ class LinkedInCompany(SerializableModel):
             context += f"Founded: {self.founded_on}\n\n"
 
         if self.funding_data:
-            # Calculate total funding using proper attribute access
-            total_funding = sum(
-                round.money_raised
-                for round in self.funding_data
-                if round.money_raised is not None
-            )
-            if total_funding:
-                context += f"Total Funding: ${total_funding:,.0f}\n"
-
-            # Add latest funding round using proper date comparison
-            latest_funding = next(
-                (
-                    round
-                    for round in sorted(
-                        self.funding_data,
-                        key=lambda x: x.announced_date or date.min,
-                        reverse=True,
-                    )
-                    if round.announced_date
-                ),
-                None,
-            )
+            timeline = self.funding_timeline()
+            if timeline.total_funding:
+                context += f"Total Funding: ${timeline.total_funding:,.0f}\n"
 
-            if latest_funding:
+            if latest_funding := timeline.latest_round:
                 context += f"Latest Funding: {latest_funding.funding_type.value}"
                 if latest_funding.money_raised is not None:
                     context += f" (${latest_funding.money_raised:,.0f})"
@@ -213,6 +255,7 @@ class LinkedInProfile(SerializableModel):
     education: list[LinkedInEducation] = []
     career_metrics: CareerMetrics | None = None
 
+    @memoized
     def to_context_string(self) -> str:
         """Convert the profile to a formatted string context."""
         context = ""
@@ -225,6 +268,8 @@ class LinkedInProfile(SerializableModel):
             context += f"Summary: {self.summary}\n\n---------\n"
         if self.city and self.country:
             context += f"Location of this candidate: {self.city}, {self.country}\n\n---------\n"
+        if self.career_metrics and (metrics := self.career_metrics.to_context_string()):
+            context += f"Career Metrics:\n{metrics}\n\n---------\n"
 
         for exp in self.experiences:
             context += f"Experience: {exp.title} at {exp.company}\n"
@@ -262,14 +307,3 @@ class LinkedInProfile(SerializableModel):
                 context += "\n---------\n"
 
         return context
-
-    def dict(self, *args, **kwargs) -> dict:
-        """Override dict to handle nested serialization properly."""
-        # Get base dictionary
-        d = super().dict(*args, **kwargs)
-
-        # Manually serialize experiences to ensure their custom dict() method is called
-        d["experiences"] = [exp.dict(*args, **kwargs) for exp in self.experiences]
-        d["education"] = [edu.dict(*args, **kwargs) for edu in self.education]
-
-        return d
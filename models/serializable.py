@@ -1,73 +1,64 @@
 from pydantic import BaseModel
-from typing import Type, Optional, TypeVar
-from datetime import date
+from typing import Any, Callable, Type, Optional, TypeVar
+from functools import wraps
 
 T = TypeVar("T", bound="SerializableModel")
 
+# Key of the memoized results in an instance's __dict__. Pydantic ignores
+# non-field keys there when dumping and comparing models.
+_MEMO = "__memo__"
+
+
+def memoized(method: Callable) -> Callable:
+    """Cache a method's result per instance and arguments.
+
+    The cache is dropped whenever a field of the instance is reassigned or the
+    instance is copied with `model_copy`. Changes made to nested models in place
+    are not tracked, so memoized methods suit data that is not mutated after it
+    is loaded.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = self.__dict__.get(_MEMO)
+        if memo is None:
+            memo = self.__dict__[_MEMO] = {}
+        key = (method.__name__, args, tuple(sorted(kwargs.items())) if kwargs else ())
+        if key not in memo:
+            memo[key] = method(self, *args, **kwargs)
+        return memo[key]
+
+    return wrapper
+
 
 class SerializableModel(BaseModel):
     """Base class for models that need Firestore serialization."""
 
-    def dict(self, *args, **kwargs) -> dict:
-        """Convert model to a Firestore-compatible dictionary."""
-        d = super().dict(*args, **kwargs)
-        return self._serialize_dict(d)
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.__dict__.pop(_MEMO, None)
+        super().__setattr__(name, value)
+
+    def model_copy(self: T, *, update: dict | None = None, deep: bool = False) -> T:
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop(_MEMO, None)
+        return copied
+
+    def dict(self, **kwargs) -> dict:
+        """Convert model to a Firestore-compatible dictionary.
+
+        Uses the serializer pydantic builds once per class from the field types:
+        dates and datetimes become ISO strings and enums their values, nested
+        models included, without walking the data in Python.
+        """
+        return self.model_dump(mode="json", **kwargs)
 
     @classmethod
     def from_dict(cls: Type[T], data: dict) -> Optional[T]:
-        """Create model instance from a Firestore dictionary."""
+        """Create model instance from a Firestore dictionary.
+
+        Only fields typed as dates are parsed from ISO strings; other strings,
+        such as descriptions that happen to look like dates, are kept as is.
+        """
         if not data:
             return None
-        return cls(**cls._deserialize_dict(data))
-
-    @staticmethod
-    def _serialize_dict(d: dict) -> dict:
-        """Recursively serialize dictionary values."""
-        for key, value in d.items():
-            if isinstance(value, date):
-                d[key] = value.isoformat()
-            elif isinstance(value, dict):
-                d[key] = SerializableModel._serialize_dict(value)
-            elif isinstance(value, list):
-                d[key] = [
-                    item.dict()
-                    if isinstance(item, SerializableModel)
-                    else SerializableModel._serialize_dict(item)
-                    if isinstance(item, dict)
-                    else item.isoformat()
-                    if isinstance(item, date)
-                    else item
-                    for item in value
-                ]
-        return d
-
-    @staticmethod
-    def _deserialize_dict(d: dict) -> dict:
-        """Recursively deserialize dictionary values."""
-        for key, value in d.items():
-            if isinstance(value, str):
-                try:
-                    d[key] = date.fromisoformat(value)
-                except ValueError:
-                    pass
-            elif isinstance(value, dict):
-                d[key] = SerializableModel._deserialize_dict(value)
-            elif isinstance(value, list):
-                d[key] = [
-                    SerializableModel._deserialize_dict(item)
-                    if isinstance(item, dict)
-                    else date.fromisoformat(item)
-                    if isinstance(item, str) and SerializableModel._is_iso_date(item)
-                    else item
-                    for item in value
-                ]
-        return d
-
-    @staticmethod
-    def _is_iso_date(value: str) -> bool:
-        """Check if a string is an ISO format date."""
-        try:
-            date.fromisoformat(value)
-            return True
-        except ValueError:
-            return False
+        return cls.model_validate(data)
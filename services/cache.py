@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def cache_key(*parts: Any) -> str:
+    """Content-address a cache entry by hashing everything that determines it."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """Two-tier cache for LLM evaluation results.
+
+    Entries live in an in-memory LRU and, when `path` is set, in a SQLite file
+    shared across processes and restarts. Both tiers expire entries after
+    `ttl_seconds` and evict the least recently used ones beyond their size limit.
+    The async methods read and write the SQLite file in a worker thread.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: Optional[float] = 7 * 24 * 60 * 60,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+        enabled: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.enabled = enabled
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # Separate locks, so memory hits on the event loop never wait for disk
+        # I/O running in a worker thread
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+        if enabled and path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "EvaluationCache":
+        ttl = os.getenv("EVALUATION_CACHE_TTL_SECONDS")
+        return cls(
+            max_entries=int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "2048")),
+            ttl_seconds=float(ttl) if ttl else 7 * 24 * 60 * 60,
+            path=os.getenv("EVALUATION_CACHE_PATH") or None,
+            max_disk_entries=int(
+                os.getenv("EVALUATION_CACHE_MAX_DISK_ENTRIES", "100000")
+            ),
+            enabled=os.getenv("EVALUATION_CACHE_ENABLED", "true").lower()
+            not in ("0", "false", "no"),
+        )
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached payload for `key`, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = self._get_disk(key, now)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async version of `get`, reading the SQLite tier in a worker thread."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._get_disk, key, now)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = self._expires_at(now)
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._db is not None:
+            self._set_disk(key, value, expires_at, now)
+
+    async def aset(self, key: str, value: str) -> None:
+        """Async version of `set`, writing the SQLite tier in a worker thread."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = self._expires_at(now)
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at, now)
+
+    def get_model(self, key: str, cls: Type[M]) -> Optional[M]:
+        value = self.get(key)
+        if value is None:
+            return None
+        return cls.model_validate_json(value)
+
+    async def aget_model(self, key: str, cls: Type[M]) -> Optional[M]:
+        value = await self.aget(key)
+        if value is None:
+            return None
+        return cls.model_validate_json(value)
+
+    def set_model(self, key: str, model: BaseModel) -> None:
+        self.set(key, model.model_dump_json())
+
+    async def aset_model(self, key: str, model: BaseModel) -> None:
+        await self.aset(key, model.model_dump_json())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _expires_at(self, now: float) -> float:
+        return now + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at >= now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                return None
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+        with self._lock:
+            self._remember(key, row[1], row[0])
+            self.disk_hits += 1
+        return row[0]
+
+    def _set_disk(self, key: str, value: str, expires_at: float, now: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune_disk(now)
+            self._db.commit()
+
+    def _prune_disk(self, now: float) -> None:
+        self._db.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        self._db.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+
+evaluation_cache = EvaluationCache.from_env()
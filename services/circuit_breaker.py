@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Optional
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every model of a fallback chain has its circuit open."""
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker driven by error rate and latency.
+
+    The breaker tracks the outcome of the last `window_size` calls. Once at least
+    `min_calls` are recorded and either the failure rate or the rate of calls
+    slower than `slow_call_seconds` reaches its threshold, the circuit opens and
+    callers skip the model. After `open_seconds` it turns half-open and lets
+    `half_open_probes` calls through: a successful probe closes it again, a
+    failed or slow one re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CircuitState.CLOSED
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+        # (failed, slow) for each recent call
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the model now; claims a probe when half-open."""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected_calls += 1
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probes_in_flight = 0
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    self.rejected_calls += 1
+                    return False
+                self._probes_in_flight += 1
+
+            return True
+
+    def record_success(self, latency: float) -> None:
+        self._record(failed=False, slow=latency >= self.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        self._record(failed=True, slow=False)
+
+    def record_slow(self) -> None:
+        """Record a call abandoned for being slow, e.g. one outrun by a hedge."""
+        self._record(failed=False, slow=True)
+
+    def release(self) -> None:
+        """Forget a call that was cancelled before it produced an outcome."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = CircuitState.CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, slow))
+            if (
+                self.state == CircuitState.CLOSED
+                and len(self._outcomes) >= self.min_calls
+            ):
+                failures = sum(failed for failed, _ in self._outcomes)
+                slow_calls = sum(slow for _, slow in self._outcomes)
+                if (
+                    failures / len(self._outcomes) >= self.failure_rate_threshold
+                    or slow_calls / len(self._outcomes) >= self.slow_call_rate_threshold
+                ):
+                    self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._outcomes.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state.value,
+                "recent_calls": calls,
+                "failure_rate": (
+                    sum(failed for failed, _ in self._outcomes) / calls
+                    if calls
+                    else 0.0
+                ),
+                "slow_call_rate": (
+                    sum(slow for _, slow in self._outcomes) / calls if calls else 0.0
+                ),
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+                "seconds_until_probe": (
+                    max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+                    if self.state == CircuitState.OPEN
+                    else None
+                ),
+            }
+
+
+# Breaker settings shared by every model; override with CIRCUIT_BREAKER_SETTINGS,
+# e.g. '{"failure_rate_threshold": 0.3, "open_seconds": 60}'
+_breaker_settings = json.loads(os.getenv("CIRCUIT_BREAKER_SETTINGS", "{}"))
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for a model."""
+    with _registry_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(name, **_breaker_settings)
+        return _circuit_breakers[name]
+
+
+def circuit_breaker_states() -> dict:
+    return {name: breaker.snapshot() for name, breaker in _circuit_breakers.items()}
@@ -1,13 +1,118 @@
-from google.cloud import secretmanager
 from dotenv import load_dotenv
+from functools import lru_cache
+import json
 import os
+import threading
+import time
 
 load_dotenv()
 
+SECRET_TTL_SECONDS = float(os.getenv("SECRET_TTL_SECONDS", "3600"))
 
-def get_secret(secret_id: str, version_id: str):
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{os.getenv('PROJECT_ID')}/secrets/{secret_id}/versions/{version_id}"
+# A failed refresh is retried after this long, serving the last known value
+SECRET_RETRY_SECONDS = 60.0
+
+# Secret Manager values and the monotonic time they are due for a refresh
+_secret_cache: dict[tuple[str, str], tuple[str, float]] = {}
+_refreshing: set[tuple[str, str]] = set()
+_fetch_locks: dict[tuple[str, str], threading.Lock] = {}
+_secret_manager_client = None
+_lock = threading.Lock()
+_client_lock = threading.Lock()
+
+
+def _from_env(secret_id: str, version_id: str) -> str | None:
+    """Look up e.g. AZURE_OPENAI_ENDPOINT_V2, then AZURE_OPENAI_ENDPOINT."""
+    name = secret_id.upper().replace("-", "_")
+    return os.getenv(f"{name}_V{version_id}") or os.getenv(name)
+
+
+@lru_cache(maxsize=1)
+def _load_file(path: str, modified_at: float) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _from_file(secret_id: str, version_id: str) -> str | None:
+    """Look up `secret_id/version_id`, then `secret_id`, in the SECRETS_FILE JSON."""
+    path = os.getenv("SECRETS_FILE")
+    if not path:
+        return None
+    # Parsed again only once the file changes, as secrets are read on every
+    # model call
+    secrets = _load_file(path, os.stat(path).st_mtime)
+    return secrets.get(f"{secret_id}/{version_id}") or secrets.get(secret_id)
+
+
+def _from_secret_manager(secret_id: str, version_id: str) -> str:
+    global _secret_manager_client
+    from google.cloud import secretmanager
+
+    with _client_lock:
+        if _secret_manager_client is None:
+            _secret_manager_client = secretmanager.SecretManagerServiceClient()
+    name = (
+        f"projects/{os.getenv('PROJECT_ID')}/secrets/{secret_id}/versions/{version_id}"
+    )
 
-    response = client.access_secret_version(request={"name": name})
+    response = _secret_manager_client.access_secret_version(request={"name": name})
     return response.payload.data.decode("UTF-8")
+
+
+def _fetch(key: tuple[str, str]) -> str:
+    """Read a secret from Secret Manager, without holding `_lock` meanwhile."""
+    value = _from_secret_manager(*key)
+    with _lock:
+        _secret_cache[key] = (value, time.monotonic() + SECRET_TTL_SECONDS)
+    return value
+
+
+def _refresh(key: tuple[str, str]) -> None:
+    try:
+        _fetch(key)
+    except Exception:
+        with _lock:
+            value, _ = _secret_cache[key]
+            _secret_cache[key] = (value, time.monotonic() + SECRET_RETRY_SECONDS)
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def get_secret(secret_id: str, version_id: str):
+    """
+    Resolve a secret from the environment, a local SECRETS_FILE or Secret Manager.
+
+    Secret Manager values are cached for SECRET_TTL_SECONDS, then refreshed in
+    a background thread while the cached value keeps being served, so callers
+    on the event loop never wait on a refresh. When a refresh fails, the last
+    known value is served and the refresh retried after SECRET_RETRY_SECONDS.
+    Only the first read of a secret waits on Secret Manager. Clients built from
+    secrets are cached by their values, so a refreshed secret gives a new
+    client.
+    """
+    if value := _from_env(secret_id, version_id) or _from_file(secret_id, version_id):
+        return value
+
+    key = (secret_id, version_id)
+    with _lock:
+        cached = _secret_cache.get(key)
+        refresh = (
+            cached is not None
+            and time.monotonic() >= cached[1]
+            and key not in _refreshing
+        )
+        if refresh:
+            _refreshing.add(key)
+        fetch_lock = _fetch_locks.setdefault(key, threading.Lock())
+    if refresh:
+        threading.Thread(target=_refresh, args=(key,), daemon=True).start()
+    if cached:
+        return cached[0]
+
+    # First read: concurrent callers of this secret wait for one fetch, while
+    # other secrets stay readable
+    with fetch_lock:
+        with _lock:
+            cached = _secret_cache.get(key)
+        return cached[0] if cached else _fetch(key)
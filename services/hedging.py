@@ -0,0 +1,97 @@
+import math
+import os
+import threading
+from collections import deque
+from typing import Optional
+
+
+class LatencyHistogram:
+    """
+    Latencies of a model's most recent successful calls, and of the calls
+    abandoned for a hedge, whose elapsed time is a lower bound of theirs.
+    """
+
+    def __init__(self, max_samples: int = 500):
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The `q` quantile (0-1) of the recorded latencies, or None if empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+class HedgingPolicy:
+    """
+    When to hedge a call to the primary model with a call to the fallback.
+
+    The hedge fires once the primary has been running for longer than the
+    `percentile` of its own recent latencies, clamped to [min_delay, max_delay].
+    Until `min_samples` latencies are recorded, `initial_delay` is used instead.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        initial_delay: float = 15.0,
+        min_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> Optional["HedgingPolicy"]:
+        """The policy configured by LLM_HEDGING_* variables, or None when disabled."""
+        enabled = os.getenv("LLM_HEDGING_ENABLED", "false").lower()
+        if enabled not in ("1", "true", "yes"):
+            return None
+        return cls(
+            percentile=float(os.getenv("LLM_HEDGING_PERCENTILE", "0.95")),
+            initial_delay=float(os.getenv("LLM_HEDGING_INITIAL_DELAY", "15")),
+        )
+
+    def delay(self, histogram: LatencyHistogram) -> float:
+        if len(histogram) < self.min_samples:
+            return self.initial_delay
+        return min(
+            self.max_delay, max(self.min_delay, histogram.percentile(self.percentile))
+        )
+
+
+_latency_histograms: dict[str, LatencyHistogram] = {}
+_registry_lock = threading.Lock()
+
+
+def get_latency_histogram(name: str) -> LatencyHistogram:
+    """The process-wide latency histogram for a model."""
+    with _registry_lock:
+        if name not in _latency_histograms:
+            _latency_histograms[name] = LatencyHistogram()
+        return _latency_histograms[name]
+
+
+def latency_percentiles() -> dict:
+    return {
+        name: {
+            "samples": len(histogram),
+            "p50": histogram.percentile(0.5),
+            "p95": histogram.percentile(0.95),
+            "p99": histogram.percentile(0.99),
+        }
+        for name, histogram in _latency_histograms.items()
+    }
@@ -1,54 +1,458 @@
-from typing import Optional, Any
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
+from typing import Optional, Any, Callable, Union
+from functools import cache, lru_cache
+import asyncio
+import logging
+import os
+import time
+import httpx
+from openai import (
+    APIStatusError,
+    AzureOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+)
+from langchain_openai import AzureChatOpenAI, ChatOpenAI
 from langchain_core.language_models import BaseLanguageModel
+from langchain_core.runnables import Runnable
 from services.get_secret import get_secret
-from langchain_google_vertexai import ChatVertexAI
+from services.hedging import HedgingPolicy, get_latency_histogram
+from services.metrics import (
+    LLM_CALL_DURATION,
+    LLM_CALLS_IN_FLIGHT,
+    LLM_FALLBACK_ACTIVATIONS,
+    LLM_RATE_LIMITED,
+    LLM_RETRIES,
+)
+from services.usage import record_usage
+from services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from services.rate_limiter import (
+    estimate_input_tokens,
+    get_rate_limiter,
+    is_rate_limit_error,
+    retry_after_seconds,
+)
 
+logger = logging.getLogger(__name__)
 
-openai_4o = AzureChatOpenAI(
-    deployment_name="gpt-4o",
-    openai_api_version="2024-08-01-preview",
-    azure_endpoint=get_secret("azure-openai-endpoint", "2"),
-    openai_api_key=get_secret("azure-openai-api-key", "2"),
-    temperature=0,
-    max_retries=5,
-)
 
-openai_4o_mini = AzureChatOpenAI(
-    deployment_name="gpt-4o-mini",
-    openai_api_version="2024-08-01-preview",
-    azure_endpoint=get_secret("azure-openai-endpoint", "2"),
-    openai_api_key=get_secret("azure-openai-api-key", "2"),
-    temperature=0,
-    max_retries=5,
-)
+def rate_limit_http_clients(deployment_name: str) -> dict:
+    """httpx clients that report every 429 to the deployment's rate limiter.
 
-gemini_2_flash = ChatVertexAI(
-    model="gemini-2.0-flash-001",
-)
+    The OpenAI SDK retries 429s internally, so hooking the transport is the only
+    way for the limiter and the metrics to see each of them and each retry,
+    rather than just the final error.
+    """
+
+    def count_retry(request: httpx.Request):
+        if request.headers.get("x-stainless-retry-count", "0") != "0":
+            LLM_RETRIES.labels(deployment_name).inc()
+
+    def report(response: httpx.Response):
+        if response.status_code != 429:
+            return
+        LLM_RATE_LIMITED.labels(deployment_name).inc()
+        if limiter := get_rate_limiter(deployment_name):
+            limiter.record_rate_limited(retry_after_seconds(response.headers))
+
+    async def acount_retry(request: httpx.Request):
+        count_retry(request)
+
+    async def areport(response: httpx.Response):
+        report(response)
+
+    return {
+        "http_client": DefaultHttpxClient(
+            event_hooks={"request": [count_retry], "response": [report]}
+        ),
+        "http_async_client": DefaultAsyncHttpxClient(
+            event_hooks={"request": [acount_retry], "response": [areport]}
+        ),
+    }
+
+
+# Clients are created on first use rather than at import, so cold starts don't
+# wait on Secret Manager and tests or local runs only need the clients they use.
+# They are cached by their secrets, so a rotated key or endpoint picked up by
+# get_secret's refresh builds a new client instead of reusing the old one.
+
+
+@lru_cache(maxsize=8)
+def _azure_chat_openai(
+    deployment_name: str, azure_endpoint: str, openai_api_key: str
+) -> AzureChatOpenAI:
+    return AzureChatOpenAI(
+        deployment_name=deployment_name,
+        openai_api_version="2024-08-01-preview",
+        azure_endpoint=azure_endpoint,
+        openai_api_key=openai_api_key,
+        temperature=0,
+        max_retries=5,
+        **rate_limit_http_clients(deployment_name),
+    )
+
+
+def get_openai_4o() -> AzureChatOpenAI:
+    return _azure_chat_openai(
+        "gpt-4o",
+        get_secret("azure-openai-endpoint", "2"),
+        get_secret("azure-openai-api-key", "2"),
+    )
+
+
+def get_openai_4o_mini() -> AzureChatOpenAI:
+    return _azure_chat_openai(
+        "gpt-4o-mini",
+        get_secret("azure-openai-endpoint", "2"),
+        get_secret("azure-openai-api-key", "2"),
+    )
+
+
+def prefetch_secrets() -> None:
+    """Read the Azure clients' secrets ahead of the first model call."""
+    try:
+        get_secret("azure-openai-endpoint", "2")
+        get_secret("azure-openai-api-key", "2")
+    except Exception:
+        logger.warning("Could not prefetch the Azure OpenAI secrets", exc_info=True)
+
+
+@cache
+def get_gemini_2_flash() -> BaseLanguageModel:
+    if endpoint := os.getenv("VERTEX_API_ENDPOINT"):
+        # A local endpoint such as benchmarks/mock_llm_server.py. ChatVertexAI
+        # makes async calls over gRPC whatever its transport, so Vertex AI's
+        # OpenAI-compatible API is called instead, with the same model name
+        project = os.getenv("GOOGLE_CLOUD_PROJECT", "local")
+        return ChatOpenAI(
+            model="gemini-2.0-flash-001",
+            base_url=f"{endpoint.rstrip('/')}/v1beta1/projects/{project}"
+            "/locations/us-central1/endpoints/openapi",
+            api_key="anonymous",
+            **rate_limit_http_clients("gemini-2.0-flash-001"),
+        )
+
+    # Imported here as the Vertex SDK alone adds seconds to import time
+    from langchain_google_vertexai import ChatVertexAI
+
+    return ChatVertexAI(
+        model="gemini-2.0-flash-001",
+    )
+
+
+_lazy_models = {
+    "openai_4o": get_openai_4o,
+    "openai_4o_mini": get_openai_4o_mini,
+    "gemini_2_flash": get_gemini_2_flash,
+}
+
+
+def __getattr__(name: str):
+    """Keep `from services.llms import openai_4o` working with lazy clients."""
+    if name in _lazy_models:
+        return _lazy_models[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+ModelSource = Union[BaseLanguageModel, Callable[[], BaseLanguageModel]]
+
+
+def _resolve(source: ModelSource) -> BaseLanguageModel:
+    return source if isinstance(source, BaseLanguageModel) else source()
+
+
+def model_name(model: BaseLanguageModel) -> str:
+    """Best-effort identifier of the deployment or model behind a client."""
+    return (
+        getattr(model, "deployment_name", None)
+        or getattr(model, "model_name", None)
+        or type(model).__name__
+    )
 
 
 class LLMWithFallbacks:
     def __init__(
-        self, primary_llm: BaseLanguageModel, fallbacks: list[BaseLanguageModel]
+        self,
+        primary_llm: ModelSource,
+        fallbacks: list[ModelSource],
+        hedging: Optional[HedgingPolicy] = None,
     ):
+        """
+        Args:
+            primary_llm: The model to call first, or a factory creating it on first use
+            fallbacks: Models or model factories to try in order when the primary fails
+            hedging: Optional policy for racing slow primary calls against a fallback
+        """
         self.primary_llm = primary_llm
         self.fallbacks = fallbacks
+        self.hedging = hedging
+        self.hedged_calls = 0
+
+    @property
+    def primary_llm(self) -> BaseLanguageModel:
+        return _resolve(self._primary_llm)
+
+    @primary_llm.setter
+    def primary_llm(self, primary_llm: ModelSource):
+        self._primary_llm = primary_llm
+
+    @property
+    def fallbacks(self) -> list[BaseLanguageModel]:
+        return [_resolve(fallback) for fallback in self._fallbacks]
+
+    @fallbacks.setter
+    def fallbacks(self, fallbacks: list[ModelSource]):
+        self._fallbacks = fallbacks
+
+    @property
+    def model_identity(self) -> str:
+        """Identifies the models answering calls, e.g. for cache keys."""
+        return ">".join(
+            model_name(model) for model in [self.primary_llm, *self.fallbacks]
+        )
 
     def with_structured_output(self, cls):
         return StructuredLLMWithFallbacks(self, cls)
 
     def invoke(self, *args, **kwargs):
+        return self._invoke(lambda model: model, *args, **kwargs)
+
+    async def ainvoke(self, *args, **kwargs):
+        return await self._ainvoke(lambda model: model, *args, **kwargs)
+
+    def _invoke(self, bind: Callable[[BaseLanguageModel], Runnable], *args, **kwargs):
+        """Invoke the primary model, trying each fallback in turn on failure.
+
+        Models with an open circuit are skipped, so calls go straight to the
+        first healthy fallback while the primary is degraded.
+
+        Args:
+            bind: Maps a model to the runnable to call, e.g. its structured output variant
+        """
+        error = None
+        fallback_reason = None
+        for model in [self.primary_llm, *self.fallbacks]:
+            if not get_circuit_breaker(model_name(model)).allow_request():
+                fallback_reason = fallback_reason or "circuit_open"
+                continue
+            if fallback_reason:
+                LLM_FALLBACK_ACTIVATIONS.labels(
+                    model_name(model), fallback_reason
+                ).inc()
+            try:
+                return self._invoke_model(model, bind, *args, **kwargs)
+            except Exception as e:
+                error = error or e
+                fallback_reason = "error"
+        raise error or CircuitOpenError(
+            f"All circuits are open for {self.model_identity}"
+        )
+
+    async def _ainvoke(
+        self, bind: Callable[[BaseLanguageModel], Runnable], *args, **kwargs
+    ):
+        """Async counterpart of `_invoke`, awaiting each model on the event loop.
+
+        With a hedging policy, a primary call that outlives the policy's delay is
+        raced against the same request to the first fallback; the first success
+        wins and the other call is cancelled.
+        """
+        if self.hedging and self.fallbacks:
+            return await self._ainvoke_hedged(bind, *args, **kwargs)
+        return await self._ainvoke_chain(
+            [self.primary_llm, *self.fallbacks], bind, *args, **kwargs
+        )
+
+    async def _ainvoke_chain(
+        self,
+        models: list[BaseLanguageModel],
+        bind: Callable[[BaseLanguageModel], Runnable],
+        *args,
+        error: Optional[Exception] = None,
+        fallback_reason: Optional[str] = None,
+        **kwargs,
+    ):
+        """Try `models` in order; `fallback_reason` is set when the first is a fallback."""
+        for model in models:
+            if not get_circuit_breaker(model_name(model)).allow_request():
+                fallback_reason = fallback_reason or "circuit_open"
+                continue
+            if fallback_reason:
+                LLM_FALLBACK_ACTIVATIONS.labels(
+                    model_name(model), fallback_reason
+                ).inc()
+            try:
+                return await self._ainvoke_model(model, bind, *args, **kwargs)
+            except Exception as e:
+                error = error or e
+                fallback_reason = "error"
+        raise error or CircuitOpenError(
+            f"All circuits are open for {self.model_identity}"
+        )
+
+    async def _ainvoke_hedged(
+        self, bind: Callable[[BaseLanguageModel], Runnable], *args, **kwargs
+    ):
+        primary, hedge, *rest = [self.primary_llm, *self.fallbacks]
+        if not get_circuit_breaker(model_name(primary)).allow_request():
+            return await self._ainvoke_chain(
+                [hedge, *rest], bind, *args, fallback_reason="circuit_open", **kwargs
+            )
+
+        outrun = asyncio.Event()
+        tasks = [
+            asyncio.create_task(
+                self._ainvoke_model(primary, bind, *args, outrun=outrun, **kwargs)
+            )
+        ]
+        try:
+            delay = self.hedging.delay(get_latency_histogram(model_name(primary)))
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and get_circuit_breaker(model_name(hedge)).allow_request():
+                self.hedged_calls += 1
+                LLM_FALLBACK_ACTIVATIONS.labels(model_name(hedge), "hedge").inc()
+                tasks.append(
+                    asyncio.create_task(
+                        self._ainvoke_model(hedge, bind, *args, **kwargs)
+                    )
+                )
+                rest_models = rest
+            else:
+                rest_models = [hedge, *rest]
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                if succeeded := [task for task in done if task.exception() is None]:
+                    if succeeded[0] is not tasks[0]:
+                        outrun.set()
+                    return succeeded[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return await self._ainvoke_chain(
+            rest_models,
+            bind,
+            *args,
+            error=tasks[0].exception(),
+            fallback_reason="error",
+            **kwargs,
+        )
+
+    def _invoke_model(
+        self,
+        model: BaseLanguageModel,
+        bind: Callable[[BaseLanguageModel], Runnable],
+        *args,
+        **kwargs,
+    ):
+        limiter = get_rate_limiter(model_name(model))
+        if limiter:
+            limiter.acquire(estimate_input_tokens(args[0] if args else ""))
+        breaker = get_circuit_breaker(model_name(model))
+        start = time.monotonic()
+        try:
+            with LLM_CALLS_IN_FLIGHT.labels(model_name(model)).track_inprogress():
+                result = _unwrap_result(model, bind(model).invoke(*args, **kwargs))
+        except Exception as e:
+            breaker.record_failure()
+            _record_error(model, e)
+            _observe_call(model, "error", time.monotonic() - start)
+            raise
+        latency = time.monotonic() - start
+        _observe_call(model, "success", latency)
+        breaker.record_success(latency)
+        get_latency_histogram(model_name(model)).record(latency)
+        if limiter:
+            limiter.record_success()
+        return result
+
+    async def _ainvoke_model(
+        self,
+        model: BaseLanguageModel,
+        bind: Callable[[BaseLanguageModel], Runnable],
+        *args,
+        outrun: Optional[asyncio.Event] = None,
+        **kwargs,
+    ):
+        """
+        Call one model, recording the outcome for its breaker, limiter and
+        latency histogram. `outrun` is set when a hedge answered first.
+        """
+        limiter = get_rate_limiter(model_name(model))
+        breaker = get_circuit_breaker(model_name(model))
+        start = time.monotonic()
+        sent = False
         try:
-            return self.primary_llm.invoke(*args, **kwargs)
+            if limiter:
+                await limiter.aacquire(estimate_input_tokens(args[0] if args else ""))
+            # Latency excludes the wait for the rate limiter
+            start = time.monotonic()
+            sent = True
+            with LLM_CALLS_IN_FLIGHT.labels(model_name(model)).track_inprogress():
+                result = _unwrap_result(
+                    model, await bind(model).ainvoke(*args, **kwargs)
+                )
+        except asyncio.CancelledError:
+            latency = time.monotonic() - start
+            if sent and outrun is not None and outrun.is_set():
+                # Only fast calls would be recorded otherwise, so the hedge
+                # delay would keep falling and hedges fire ever earlier
+                breaker.record_slow()
+                get_latency_histogram(model_name(model)).record(latency)
+            else:
+                breaker.release()
+            _observe_call(model, "cancelled", latency)
+            raise
         except Exception as e:
-            for fallback in self.fallbacks:
-                try:
-                    return fallback.invoke(*args, **kwargs)
-                except Exception:
-                    continue
-            raise e
+            breaker.record_failure()
+            _record_error(model, e)
+            _observe_call(model, "error", time.monotonic() - start)
+            raise
+        latency = time.monotonic() - start
+        _observe_call(model, "success", latency)
+        breaker.record_success(latency)
+        get_latency_histogram(model_name(model)).record(latency)
+        if limiter:
+            limiter.record_success()
+        return result
+
+
+def _unwrap_result(model: BaseLanguageModel, result: Any) -> Any:
+    """Record the usage of a model response and return its parsed output.
+
+    Structured calls ask for the raw message alongside the parsed object so its
+    token usage can be reported; a response that failed to parse raises, which
+    lets the next model in the chain take over.
+    """
+    if isinstance(result, dict) and "parsed" in result and "raw" in result:
+        record_usage(model_name(model), result["raw"])
+        if result.get("parsing_error") or result["parsed"] is None:
+            raise result.get("parsing_error") or ValueError(
+                f"{model_name(model)} returned no structured output"
+            )
+        return result["parsed"]
+
+    record_usage(model_name(model), result)
+    return result
+
+
+def _observe_call(model: BaseLanguageModel, outcome: str, latency: float) -> None:
+    LLM_CALL_DURATION.labels(model_name(model), outcome).observe(latency)
+
+
+def _record_error(model: BaseLanguageModel, error: Exception) -> None:
+    # OpenAI responses already reached the limiter through the http client hooks
+    if is_rate_limit_error(error) and not isinstance(error, APIStatusError):
+        LLM_RATE_LIMITED.labels(model_name(model)).inc()
+        if limiter := get_rate_limiter(model_name(model)):
+            limiter.record_rate_limited(
+                retry_after_seconds(
+                    getattr(getattr(error, "response", None), "headers", None)
+                )
+            )
 
 
 class StructuredLLMWithFallbacks:
@@ -56,27 +460,35 @@ class StructuredLLMWithFallbacks:
         self.llm_with_fallbacks = llm_with_fallbacks
         self.cls = cls
 
+    def _bind(self, model: BaseLanguageModel) -> Runnable:
+        return model.with_structured_output(self.cls, include_raw=True)
+
     def invoke(self, *args, **kwargs):
-        primary = self.llm_with_fallbacks.primary_llm.with_structured_output(self.cls)
-        try:
-            return primary.invoke(*args, **kwargs)
-        except Exception as e:
-            for fallback in self.llm_with_fallbacks.fallbacks:
-                try:
-                    fallback_structured = fallback.with_structured_output(self.cls)
-                    return fallback_structured.invoke(*args, **kwargs)
-                except Exception:
-                    continue
-            raise e
+        return self.llm_with_fallbacks._invoke(self._bind, *args, **kwargs)
 
+    async def ainvoke(self, *args, **kwargs):
+        return await self.llm_with_fallbacks._ainvoke(self._bind, *args, **kwargs)
 
-llm = LLMWithFallbacks(openai_4o, [gemini_2_flash])
-llm_fast = LLMWithFallbacks(openai_4o_mini, [gemini_2_flash])
 
+llm = LLMWithFallbacks(
+    get_openai_4o, [get_gemini_2_flash], hedging=HedgingPolicy.from_env()
+)
+llm_fast = LLMWithFallbacks(
+    get_openai_4o_mini, [get_gemini_2_flash], hedging=HedgingPolicy.from_env()
+)
 
-def get_azure_openai() -> Optional[AzureOpenAI]:
+
+@lru_cache(maxsize=2)
+def _azure_openai(api_key: str, azure_endpoint: str) -> AzureOpenAI:
     return AzureOpenAI(
-        api_key=get_secret("azure-openai-api-key", "1"),
+        api_key=api_key,
         api_version="2024-08-01-preview",
-        azure_endpoint=get_secret("azure-openai-endpoint", "1"),
+        azure_endpoint=azure_endpoint,
+    )
+
+
+def get_azure_openai() -> Optional[AzureOpenAI]:
+    return _azure_openai(
+        get_secret("azure-openai-api-key", "1"),
+        get_secret("azure-openai-endpoint", "1"),
     )
@@ -0,0 +1,102 @@
+"""
+Prometheus metrics of the service, exposed on /metrics.
+"""
+
+import inspect
+import time
+from functools import wraps
+from typing import Callable
+from prometheus_client import Counter, Gauge, Histogram
+
+NODE_DURATION = Histogram(
+    "evaluation_node_duration_seconds",
+    "Duration of evaluation graph node runs",
+    ["node"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "Duration of calls to a model, including SDK retries",
+    ["model", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens",
+    "Tokens reported by model responses; kind is prompt, cached_prompt or completion",
+    ["model", "kind"],
+)
+LLM_FALLBACK_ACTIVATIONS = Counter(
+    "llm_fallback_activations",
+    "Calls sent to a fallback model; reason is error, circuit_open or hedge",
+    ["model", "reason"],
+)
+LLM_RATE_LIMITED = Counter(
+    "llm_rate_limited_responses",
+    "429 responses received from a model, including those retried by the SDK",
+    ["model"],
+)
+LLM_RETRIES = Counter(
+    "llm_http_retries",
+    "Requests retried by the OpenAI SDK",
+    ["model"],
+)
+LLM_CALLS_IN_FLIGHT = Gauge(
+    "llm_calls_in_flight",
+    "Calls to a model currently running",
+    ["model"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served, including streamed responses",
+    ["path"],
+)
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """Record the duration of every run of a graph node."""
+    histogram = NODE_DURATION.labels(name)
+
+    if inspect.iscoroutinefunction(node):
+
+        @wraps(node)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await node(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return async_wrapper
+
+    @wraps(node)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return node(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+class InFlightRequestsMiddleware:
+    """ASGI middleware tracking HTTP_REQUESTS_IN_FLIGHT per route path.
+
+    Paths that match no route are counted as "other" to bound the label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: set[str] | None = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if self._paths is None:
+            self._paths = {
+                getattr(route, "path", None) for route in scope["app"].routes
+            }
+        path = scope["path"] if scope["path"] in self._paths else "other"
+        with HTTP_REQUESTS_IN_FLIGHT.labels(path).track_inprogress():
+            await self.app(scope, receive, send)
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+# Output allowance reserved per call on top of the prompt. Our structured
+# outputs are capped at ~100 words of reasoning.
+COMPLETION_TOKEN_ALLOWANCE = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting requests."""
+    return len(text) // 4 + 1
+
+
+def estimate_input_tokens(input: Any) -> int:
+    """Estimate the prompt tokens of a model input: a string or list of messages."""
+    if isinstance(input, str):
+        return estimate_tokens(input)
+    if isinstance(input, (list, tuple)):
+        return sum(estimate_input_tokens(message) for message in input)
+    content = getattr(input, "content", None)
+    if isinstance(content, str):
+        return estimate_tokens(content)
+    if isinstance(content, list):
+        return sum(
+            estimate_tokens(
+                part if isinstance(part, str) else str(part.get("text", ""))
+            )
+            for part in content
+        )
+    return 0
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception from any provider SDK signals HTTP 429."""
+    return (
+        getattr(error, "status_code", None) == 429
+        or getattr(error, "code", None) == 429
+        or type(error).__name__
+        in ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+    )
+
+
+def retry_after_seconds(headers: Optional[Any]) -> Optional[float]:
+    """The Retry-After hint in a 429 response's headers, if the provider sent one."""
+    try:
+        return float((headers or {}).get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose reservations may overdraw it, queueing later callers."""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.level = capacity
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` from the bucket and return how long the caller must wait."""
+        self.level = min(
+            self.capacity, self.level + (now - self.updated_at) * self.per_second
+        )
+        self.updated_at = now
+        self.level -= amount
+        return max(0.0, -self.level / self.per_second)
+
+    def drain(self) -> None:
+        self.level = min(self.level, 0.0)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget for one model deployment.
+
+    Callers reserve capacity before dispatching and sleep until it is available,
+    so bursts queue locally instead of turning into 429 retry storms. The
+    effective rate adapts to the provider: a 429 halves it and drains the
+    buckets, and each successful call recovers a little of it. The 429s of one
+    burst, concurrent calls and SDK retries alike, count as a single decrease:
+    the rate is cut at most once per Retry-After period, or per
+    `decrease_interval` seconds when the provider sends no longer hint.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        min_rate_fraction: float = 0.1,
+        recovery_step: float = 0.02,
+        decrease_interval: float = 1.0,
+    ):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_rate_fraction = min_rate_fraction
+        self.recovery_step = recovery_step
+        self.decrease_interval = decrease_interval
+
+        self.rate_fraction = 1.0
+        self.blocked_until = 0.0
+        self.decreased_until = 0.0
+        self.rate_limited_count = 0
+        self.queued_seconds = 0.0
+
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._requests.reserve(1, now),
+                self._tokens.reserve(tokens + COMPLETION_TOKEN_ALLOWANCE, now),
+                self.blocked_until - now,
+            )
+            self.queued_seconds += wait
+            return wait
+
+    def acquire(self, tokens: int) -> None:
+        if wait := self._reserve(tokens):
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        if wait := self._reserve(tokens):
+            await asyncio.sleep(wait)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.rate_fraction < 1.0:
+                self._set_rate_fraction(self.rate_fraction + self.recovery_step)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited_count += 1
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            if now < self.decreased_until:
+                return
+            self.decreased_until = now + max(retry_after or 0.0, self.decrease_interval)
+            self._set_rate_fraction(self.rate_fraction / 2)
+            self._requests.drain()
+            self._tokens.drain()
+
+    def _set_rate_fraction(self, fraction: float) -> None:
+        self.rate_fraction = min(1.0, max(self.min_rate_fraction, fraction))
+        self._requests.per_second = self.requests_per_minute / 60 * self.rate_fraction
+        self._tokens.per_second = self.tokens_per_minute / 60 * self.rate_fraction
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_minute": self.requests_per_minute * self.rate_fraction,
+            "tokens_per_minute": self.tokens_per_minute * self.rate_fraction,
+            "rate_fraction": self.rate_fraction,
+            "rate_limited": self.rate_limited_count,
+            "queued_seconds": self.queued_seconds,
+        }
+
+
+# Per-deployment quotas; override with LLM_RATE_LIMITS, e.g.
+# '{"gpt-4o": {"requests_per_minute": 600, "tokens_per_minute": 100000}}'
+DEFAULT_RATE_LIMITS = {
+    "gpt-4o": {"requests_per_minute": 2700, "tokens_per_minute": 450_000},
+    "gpt-4o-mini": {"requests_per_minute": 12_000, "tokens_per_minute": 2_000_000},
+    "gemini-2.0-flash-001": {
+        "requests_per_minute": 1000,
+        "tokens_per_minute": 4_000_000,
+    },
+}
+
+_rate_limits = {**DEFAULT_RATE_LIMITS, **json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))}
+_rate_limiters: dict[str, Optional[RateLimiter]] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> Optional[RateLimiter]:
+    """The process-wide limiter for a deployment, or None if it has no quota."""
+    with _registry_lock:
+        if name not in _rate_limiters:
+            limits = _rate_limits.get(name)
+            _rate_limiters[name] = RateLimiter(name, **limits) if limits else None
+        return _rate_limiters[name]
+
+
+def rate_limiter_stats() -> dict:
+    return {
+        name: limiter.stats()
+        for name, limiter in _rate_limiters.items()
+        if limiter is not None
+    }
@@ -0,0 +1,102 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from services.metrics import LLM_TOKENS
+
+
+class TokenUsage:
+    """Token counts summed over a number of LLM calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    def add(
+        self, input_tokens: int, cached_input_tokens: int, output_tokens: int
+    ) -> None:
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.cached_input_tokens += cached_input_tokens
+        self.output_tokens += output_tokens
+
+    @classmethod
+    def sum(cls, usages: list[dict]) -> "TokenUsage":
+        """Sum usages previously exported with `as_dict`."""
+        total = cls()
+        for usage in usages:
+            total.calls += usage["calls"]
+            total.input_tokens += usage["input_tokens"]
+            total.cached_input_tokens += usage["cached_input_tokens"]
+            total.output_tokens += usage["output_tokens"]
+        return total
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar(
+    "current_usage", default=None
+)
+_usage_by_model: dict[str, TokenUsage] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """Collect the token usage of the LLM calls made inside the block.
+
+    Tasks started inside the block, such as hedged requests, report to it too.
+    """
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def _cached_tokens(message: Any, usage_metadata: dict) -> int:
+    if cached := (usage_metadata.get("input_token_details") or {}).get("cache_read"):
+        return cached
+
+    # Older integrations only expose the provider's raw usage report
+    response_metadata = getattr(message, "response_metadata", None) or {}
+    openai_usage = response_metadata.get("token_usage") or {}
+    if cached := (openai_usage.get("prompt_tokens_details") or {}).get("cached_tokens"):
+        return cached
+    vertex_usage = response_metadata.get("usage_metadata") or {}
+    return vertex_usage.get("cached_content_token_count") or 0
+
+
+def record_usage(model: str, message: Any) -> None:
+    """Record the usage reported on an AIMessage for the model and current tracker."""
+    usage_metadata = getattr(message, "usage_metadata", None)
+    if not usage_metadata:
+        return
+
+    counts = (
+        usage_metadata.get("input_tokens", 0),
+        _cached_tokens(message, usage_metadata),
+        usage_metadata.get("output_tokens", 0),
+    )
+    if usage := _current_usage.get():
+        usage.add(*counts)
+    with _lock:
+        _usage_by_model.setdefault(model, TokenUsage()).add(*counts)
+
+    input_tokens, cached_input_tokens, output_tokens = counts
+    LLM_TOKENS.labels(model, "prompt").inc(input_tokens)
+    LLM_TOKENS.labels(model, "cached_prompt").inc(cached_input_tokens)
+    LLM_TOKENS.labels(model, "completion").inc(output_tokens)
+
+
+def usage_by_model() -> dict:
+    return {model: usage.as_dict() for model, usage in _usage_by_model.items()}
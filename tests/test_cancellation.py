@@ -0,0 +1,37 @@
+import asyncio
+
+from agent.cancellation import CancelScope
+
+
+async def call(delay: float) -> str:
+    await asyncio.sleep(delay)
+    return "done"
+
+
+def test_cancel_after_every_call_finished_is_not_partial():
+    async def run():
+        scope = CancelScope()
+        result = await scope.run(call(0))
+        scope.cancel("required trait not met")
+        return result, scope.cancelled
+
+    assert asyncio.run(run()) == ("done", False)
+
+
+def test_cancel_interrupting_a_call_is_partial():
+    async def run():
+        scope = CancelScope()
+        task = asyncio.create_task(scope.run(call(1)))
+        await asyncio.sleep(0.01)
+        scope.cancel("required trait not met")
+        return await task, scope.cancelled
+
+    assert asyncio.run(run()) == (None, True)
+
+
+def test_calls_after_cancel_are_skipped():
+    scope = CancelScope()
+    scope.cancel("required trait not met")
+
+    assert scope.run_sync(lambda: "done") is None
+    assert scope.cancelled
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+import services.get_secret as get_secret_module
+from services.get_secret import get_secret
+
+
+@pytest.fixture
+def secret_manager(monkeypatch):
+    """A slow Secret Manager answering `values[secret_id]`."""
+    values = {}
+    release = threading.Event()
+
+    def from_secret_manager(secret_id, version_id):
+        release.wait(5)
+        return values[secret_id]
+
+    monkeypatch.delenv("SECRETS_FILE", raising=False)
+    monkeypatch.setattr(get_secret_module, "_secret_cache", {})
+    monkeypatch.setattr(get_secret_module, "_from_secret_manager", from_secret_manager)
+    return values, release
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_secret_is_served_while_refreshing(monkeypatch, secret_manager):
+    values, release = secret_manager
+    values["api-key"] = "old"
+    release.set()
+    assert get_secret("api-key", "1") == "old"
+
+    release.clear()
+    values["api-key"] = "new"
+    monkeypatch.setattr(get_secret_module, "SECRET_TTL_SECONDS", 0)
+    get_secret_module._secret_cache[("api-key", "1")] = ("old", 0.0)
+
+    started = time.monotonic()
+    assert get_secret("api-key", "1") == "old"
+    assert time.monotonic() - started < 0.5
+
+    release.set()
+    wait_for(lambda: get_secret_module._secret_cache[("api-key", "1")][0] == "new")
+    assert get_secret("api-key", "1") == "new"
+
+
+def test_first_read_does_not_block_other_secrets(secret_manager):
+    values, release = secret_manager
+    values.update({"endpoint": "https://example.com", "api-key": "key"})
+    get_secret_module._secret_cache[("endpoint", "1")] = ("https://example.com", 1e12)
+
+    reader = threading.Thread(target=get_secret, args=("api-key", "1"))
+    reader.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    assert get_secret("endpoint", "1") == "https://example.com"
+    assert time.monotonic() - started < 0.5
+    release.set()
+    reader.join()
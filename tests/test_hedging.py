@@ -0,0 +1,34 @@
+import asyncio
+import random
+
+from benchmarks.fake_llm import FakeChatModel, Latency
+from services.circuit_breaker import get_circuit_breaker
+from services.hedging import HedgingPolicy, get_latency_histogram
+from services.llms import LLMWithFallbacks
+
+
+def test_hedge_delay_stays_put_under_sustained_hedging():
+    primary = FakeChatModel(
+        model_name="hedged-primary", latency=Latency("uniform", 0.02)
+    )
+    hedge = FakeChatModel(model_name="hedged-fallback")
+    policy = HedgingPolicy(percentile=0.5, min_samples=20, min_delay=0.001)
+    llm = LLMWithFallbacks(primary, [hedge], hedging=policy)
+
+    histogram = get_latency_histogram("hedged-primary")
+    rng = random.Random(0)
+    for _ in range(20):
+        histogram.record(rng.uniform(0, 0.04))
+    initial_delay = policy.delay(histogram)
+
+    async def run():
+        for _ in range(100):
+            await llm.ainvoke("Evaluate.")
+        # Let the cancelled primaries record their outcome
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert llm.hedged_calls > 20
+    assert policy.delay(histogram) > initial_delay * 0.7
+    assert get_circuit_breaker("hedged-primary").snapshot()["slow_call_rate"] > 0
@@ -0,0 +1,54 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+import services.llms as llms
+from benchmarks import mock_llm_server
+from benchmarks.fake_llm import FakeChatModel
+from models.base import TraitEvaluationOutput
+
+
+class FailingChatModel(FakeChatModel):
+    async def _agenerate(self, *args, **kwargs):
+        raise RuntimeError("primary unavailable")
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(mock_llm_server.app, port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture
+def gemini(monkeypatch, endpoint):
+    monkeypatch.setenv("VERTEX_API_ENDPOINT", endpoint)
+    llms.get_gemini_2_flash.cache_clear()
+    yield llms.get_gemini_2_flash
+    llms.get_gemini_2_flash.cache_clear()
+
+
+def test_async_fallback_reaches_vertex_mock(gemini):
+    mock_llm_server.stats.clear()
+    llm = llms.LLMWithFallbacks(FailingChatModel(model_name="failing"), [gemini])
+
+    output = asyncio.run(
+        llm.with_structured_output(TraitEvaluationOutput).ainvoke("Evaluate.")
+    )
+
+    assert isinstance(output, TraitEvaluationOutput)
+    assert mock_llm_server.stats["vertex_200"] == 1
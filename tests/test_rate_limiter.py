@@ -0,0 +1,39 @@
+import time
+
+from services.rate_limiter import RateLimiter
+
+
+def make_limiter(**kwargs) -> RateLimiter:
+    return RateLimiter(
+        "test", requests_per_minute=600, tokens_per_minute=100_000, **kwargs
+    )
+
+
+def test_burst_of_429s_decreases_the_rate_once():
+    limiter = make_limiter()
+
+    for _ in range(14):
+        limiter.record_rate_limited()
+
+    assert limiter.rate_fraction == 0.5
+    assert limiter.rate_limited_count == 14
+
+
+def test_429s_after_the_window_decrease_the_rate_again():
+    limiter = make_limiter(decrease_interval=0.01)
+
+    limiter.record_rate_limited()
+    time.sleep(0.02)
+    limiter.record_rate_limited()
+
+    assert limiter.rate_fraction == 0.25
+
+
+def test_retry_after_extends_the_window():
+    limiter = make_limiter(decrease_interval=0.01)
+
+    limiter.record_rate_limited(retry_after=60)
+    time.sleep(0.02)
+    limiter.record_rate_limited()
+
+    assert limiter.rate_fraction == 0.5
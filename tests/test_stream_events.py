@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_llm import Latency, install_fake_models
+from benchmarks.fixtures import make_job, make_profile, make_source_str
+
+
+@pytest.fixture(scope="module")
+def client():
+    install_fake_models(Latency())
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_stream_events_over_http(client):
+    body = {
+        "input": {
+            "source_str": make_source_str(sources=2, seed=1),
+            "profile": make_profile(experiences=3, seed=1).model_dump(mode="json"),
+            "job": make_job(traits=2, calibrated_profiles=0).model_dump(mode="json"),
+            "citations": [],
+        }
+    }
+
+    response = client.post("/evaluate/stream_events", json=body)
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert "event: error" not in lines
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in lines
+        if line.startswith("data: {")
+    ]
+    custom = [event["name"] for event in events if event["event"] == "on_custom_event"]
+    assert sorted(custom) == [
+        "evaluation",
+        "fit",
+        "trait_evaluation",
+        "trait_evaluation",
+    ]
@@ -0,0 +1,29 @@
+import pytest
+
+from models.career import TechStack, TechStackPatterns
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "built our data infrastructure",
+        "built our (data infrastructure)",
+        "built our\ndata infrastructure",
+        "data infrastructure",
+    ],
+)
+def test_contained_keyword_counted_once(text):
+    match = TechStackPatterns.match(text)
+
+    assert match.keywords == {"data infrastructure": 1, "infrastructure": 1}
+    assert match.stacks == {TechStack.DATA, TechStack.INFRASTRUCTURE}
+
+
+def test_keywords_after_punctuation_and_newlines():
+    match = TechStackPatterns.match("Skills:\npython, (react)\n- kubernetes/aws")
+
+    assert match.keywords == {"python": 1, "react": 1, "kubernetes": 1, "aws": 1}
+
+
+def test_keywords_must_start_a_word():
+    assert TechStackPatterns.match("maintained the domain").keywords == {}
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import agent.helper_functions as helper_functions
+from benchmarks.fixtures import make_job, make_profile
+from models.base import (
+    MultiTraitEvaluationOutput,
+    TraitEvaluation,
+    TraitEvaluationOutput,
+)
+from services.cache import EvaluationCache
+
+
+class StructuredModel:
+    """Answers combined calls with `combined` and single-trait calls alike."""
+
+    model_identity = "stub"
+
+    def __init__(self, combined: MultiTraitEvaluationOutput, calls: list):
+        self.combined = combined
+        self.calls = calls
+
+    def with_structured_output(self, schema):
+        self.schema = schema
+        return self
+
+    def _answer(self):
+        self.calls.append(self.schema.__name__)
+        if self.schema is MultiTraitEvaluationOutput:
+            return self.combined
+        return TraitEvaluationOutput(value=False, evaluation="Evaluated alone.")
+
+    def invoke(self, messages):
+        return self._answer()
+
+    async def ainvoke(self, messages):
+        return self._answer()
+
+
+@pytest.fixture
+def job():
+    return make_job(traits=2, calibrated_profiles=0)
+
+
+@pytest.fixture
+def calls(monkeypatch, job):
+    first, second = (trait.trait for trait in job.key_traits)
+    combined = MultiTraitEvaluationOutput(
+        evaluations=[
+            TraitEvaluation(trait=first, value=True, evaluation="Meets it."),
+            TraitEvaluation(trait=second, value=True, evaluation="Meets it."),
+            TraitEvaluation(trait=second, value=False, evaluation="Does not."),
+        ]
+    )
+    calls = []
+    monkeypatch.setattr(helper_functions, "llm", StructuredModel(combined, calls))
+    monkeypatch.setattr(
+        helper_functions, "evaluation_cache", EvaluationCache(enabled=False)
+    )
+    return calls
+
+
+def evaluate(job, asynchronous: bool):
+    args = (job.key_traits, make_profile(experiences=2), "", "", job)
+    if asynchronous:
+        return asyncio.run(helper_functions.aget_trait_evaluations(*args))
+    return helper_functions.get_trait_evaluations(*args)
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_duplicate_answers_are_re_evaluated(job, calls, asynchronous):
+    first, second = (trait.trait for trait in job.key_traits)
+
+    evaluations = evaluate(job, asynchronous)
+
+    assert list(evaluations) == [first, second]
+    assert evaluations[first].evaluation == "Meets it."
+    assert evaluations[second].evaluation == "Evaluated alone."
+    assert calls == ["MultiTraitEvaluationOutput", "TraitEvaluationOutput"]
+
+
+def test_cache_key_depends_on_whether_the_trait_is_required(job):
+    trait = job.key_traits[0]
+    args = (make_profile(experiences=2), "", "", job)
+
+    keys = {
+        helper_functions._trait_evaluation_cache_key(
+            trait.model_copy(update={"required": required}), *args
+        )
+        for required in (True, False)
+    }
+
+    assert len(keys) == 2